@@ -0,0 +1,353 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        # Returns (value, remaining_ttl) so callers can promote entries between tiers.
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[0] - now
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        # Peek without touching LRU order or hit/miss counters.
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class SQLiteCache:
+    """On-disk JSON cache with TTLs, so warm entries survive restarts and are shared by every worker on the host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Workers write concurrently; wait for the lock instead of failing with "database is locked".
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.purge_expired()
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl)
+            )
+            self._conn.commit()
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        remaining = row[0] - time.time() if row is not None else 0.0
+        return remaining if remaining > 0 else None
+
+    def clear(self, prefix: str = "") -> None:
+        # Prefix match by range, so "_" and "%" in keys are not LIKE wildcards.
+        with self._lock:
+            if prefix:
+                self._conn.execute("DELETE FROM cache WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff"))
+            else:
+                self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "size": size, "hits": self.hits, "misses": self.misses}
+
+
+class RedisCache:
+    """JSON cache on a Redis-compatible server (Redis, Valkey, KeyDB, ...), shared across hosts.
+
+    Takes any client with the redis-py get/set/pttl/pipeline/scan_iter/delete API, so a
+    local stand-in can replace the server.
+    """
+
+    def __init__(self, client: Any, url: str = ""):
+        self.url = url
+        self.hits = 0
+        self.misses = 0
+        self._client = client
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        pipe = self._client.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        value, pttl = pipe.execute()
+        # pttl is -2 for a missing key and -1 for one without expiry, which we never write.
+        if value is None or pttl is None or pttl == -2:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value), (pttl / 1000.0 if pttl > 0 else float("inf"))
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(key, json.dumps(value, default=str), px=max(1, int(ttl * 1000)))
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        pttl = self._client.pttl(key)
+        if pttl is None or pttl == -2:
+            return None
+        return pttl / 1000.0 if pttl > 0 else float("inf")
+
+    def clear(self, prefix: str = "") -> None:
+        batch = []
+        for key in self._client.scan_iter(match=prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                self._client.delete(*batch)
+                batch = []
+        if batch:
+            self._client.delete(*batch)
+
+    def stats(self) -> Dict[str, Any]:
+        # Credentials stay out of /cache/stats.
+        return {"backend": "redis", "url": self.url.split("@")[-1], "hits": self.hits, "misses": self.misses}
+
+
+def _key_str(key: Hashable) -> str:
+    return "|".join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+
+
+class TieredCache:
+    """In-memory LRU tier in front of an optional shared tier (SQLite or Redis).
+
+    Shared keys are prefixed with the namespace, so several caches can use one backend.
+    A failing shared tier counts as a miss instead of failing the request.
+    """
+
+    def __init__(self, memory: TTLCache, shared: Optional[Any] = None, namespace: str = ""):
+        self.memory = memory
+        self.shared = shared
+        self.namespace = namespace
+        self.fetches = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{_key_str(key)}" if self.namespace else _key_str(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry[0]
+        return self._get_shared(key, default)
+
+    def _get_shared(self, key: Hashable, default: Any) -> Any:
+        if self.shared is not None:
+            try:
+                entry = self.shared.get_entry(self._shared_key(key))
+            except Exception:
+                self.shared_errors += 1
+                entry = None
+            if entry is not None:
+                value, remaining = entry
+                self.shared_hits += 1
+                self.memory.set(key, value, ttl=min(remaining, self.memory.ttl))
+                return value
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.memory.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        self._set_shared(key, value, ttl)
+
+    def _set_shared(self, key: Hashable, value: Any, ttl: float) -> None:
+        if self.shared is not None:
+            try:
+                self.shared.set(self._shared_key(key), value, ttl)
+            except Exception:
+                self.shared_errors += 1
+
+    # For event-loop callers: the shared tier is a blocking SQLite or Redis call, so it
+    # runs in a thread; memory hits and caches without a shared tier stay inline.
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry[0]
+        if self.shared is None:
+            return default
+        return await asyncio.to_thread(self._get_shared, key, default)
+
+    async def aset(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.memory.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.shared is not None:
+            await asyncio.to_thread(self._set_shared, key, value, ttl)
+
+    def ttl_remaining(self, key: Hashable) -> Optional[float]:
+        # Checks the shared tier too, so a refresh done by another worker counts.
+        remaining = self.memory.ttl_remaining(key)
+        if self.shared is not None:
+            try:
+                shared = self.shared.ttl_remaining(self._shared_key(key))
+            except Exception:
+                self.shared_errors += 1
+                shared = None
+            if shared is not None:
+                remaining = max(remaining or 0.0, shared)
+        return remaining
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        # None results are never cached, so a failed fetch is retried next time.
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        self.fetches += 1
+        value = fetch()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear(f"{self.namespace}:" if self.namespace else "")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "shared": {"hits": self.shared_hits, "errors": self.shared_errors} if self.shared is not None else None,
+            "upstream_fetches": self.fetches
+        }
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution whose result all callers share."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._calls.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._calls[key] = _Flight()
+                self.executions += 1
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                flight.value = fn()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Futures are bound to their loop, so flights are never shared across loops.
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = self._tasks[task_key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            self.executions += 1
+        else:
+            self.shared += 1
+        # Shield so one cancelled caller does not cancel the others.
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"executions": self.executions, "shared": self.shared, "in_flight": len(self._calls) + len(self._tasks)}
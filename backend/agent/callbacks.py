@@ -0,0 +1,57 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .metrics import EXTERNAL_SECONDS, LLM_TOKENS, RequestTrace, _current_trace
+
+
+class LLMUsageHandler(BaseCallbackHandler):
+    """Times every chat-model call and counts its tokens, attributed to the calling graph node."""
+
+    def __init__(self, source: str = "groq"):
+        self.source = source
+        self._runs: Dict[UUID, Tuple[float, str, Optional[RequestTrace]]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        self._runs[run_id] = (time.perf_counter(), node, _current_trace.get())
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "ok", _token_usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error", (0, 0))
+
+    def _finish(self, run_id: UUID, outcome: str, tokens: Tuple[int, int]) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        start, node, trace = run
+        duration = time.perf_counter() - start
+        EXTERNAL_SECONDS.observe(duration, source=self.source, outcome=outcome)
+        prompt_tokens, completion_tokens = tokens
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, node=node, kind="prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, node=node, kind="completion")
+        if trace is not None:
+            trace.add(
+                "llm", f"{self.source}:{node}", start, duration,
+                outcome=None if outcome == "ok" else outcome,
+                prompt_tokens=prompt_tokens or None, completion_tokens=completion_tokens or None
+            )
+
+
+def _token_usage(response: Any) -> Tuple[int, int]:
+    for generations in getattr(response, "generations", []) or []:
+        for gen in generations:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+llm_usage_handler = LLMUsageHandler()
@@ -0,0 +1,89 @@
+import asyncio
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable
+
+# Clients and modules built on first use instead of at import: LangChain, LangGraph,
+# yfinance and pandas take over a second to import, which a scale-to-zero host
+# would otherwise add to its first response.
+WARMUP_CLIENTS = [c.strip() for c in os.environ.get("WARMUP_CLIENTS", "graph,llm,ddgs").split(",") if c.strip()]
+# Seconds after startup before the warm-up begins, so it does not compete with the
+# health check and first page load for the CPU. A request that needs a client sooner
+# builds it on demand.
+WARMUP_DELAY = float(os.environ.get("WARMUP_DELAY", "1.0"))
+
+
+class ClientRegistry:
+    """Named, lazily built shared clients; each is constructed once per process."""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._build_seconds: Dict[str, float] = {}
+        # Reentrant: building the graph imports nodes, which may ask for other clients.
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self._build_seconds[name] = time.perf_counter() - start
+            return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        # Built off the event loop, so a slow import never stalls other requests.
+        if name in self._instances:
+            return self._instances[name]
+        return await asyncio.to_thread(self.get, name)
+
+    def set(self, name: str, instance: Any) -> None:
+        # Swaps in a replacement (bench replay, fakes) without building the original.
+        with self._lock:
+            self._instances[name] = instance
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warm(self, names: Iterable[str] = WARMUP_CLIENTS, delay: float = WARMUP_DELAY) -> None:
+        await asyncio.sleep(delay)
+        for name in names:
+            await self.aget(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {"loaded": name in self._instances, "build_seconds": round(self._build_seconds.get(name, 0.0), 3)}
+            for name in self._factories
+        }
+
+
+def _llm():
+    from langchain_groq import ChatGroq
+    from . import http_pool
+    # Allow model override via env to avoid deprecations. Groq traffic goes through the
+    # shared "groq" pool, so sync and async calls reuse warm connections.
+    return ChatGroq(
+        model=os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile"), temperature=0,
+        http_client=http_pool.client("groq"), http_async_client=http_pool.new_async_client("groq")
+    )
+
+
+def _ddgs():
+    from .search import PooledDuckDuckGoSearch
+    return PooledDuckDuckGoSearch(max_results=5)
+
+
+clients = ClientRegistry()
+clients.register("llm", _llm)
+clients.register("ddgs", _ddgs)
+clients.register("nodes", lambda: importlib.import_module(".nodes", __package__))
+clients.register("graph", lambda: importlib.import_module(".graph", __package__).graph)
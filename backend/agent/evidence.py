@@ -0,0 +1,139 @@
+import math
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+# Approximate token budget for all evidence snippets in one draft prompt (~4 chars per token).
+EVIDENCE_TOKEN_BUDGET = int(os.environ.get("EVIDENCE_TOKEN_BUDGET", "400"))
+# Articles whose titles share at least this fraction of words are treated as the same story.
+DUPLICATE_SIMILARITY = float(os.environ.get("EVIDENCE_DUPLICATE_SIMILARITY", "0.7"))
+# Days for a story's recency weight to halve.
+RECENCY_HALF_LIFE = float(os.environ.get("EVIDENCE_RECENCY_HALF_LIFE", "7"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "and", "the", "of", "to", "in", "on", "for", "is", "as", "at", "by", "with", "its", "s"}
+_RELATIVE_DATE_RE = re.compile(r"\b(\d+)\s+(minute|hour|day|week|month)s?\s+ago\b", re.I)
+_ABSOLUTE_DATE_RE = re.compile(r"\b([A-Z][a-z]{2})\s+(\d{1,2}),\s+(\d{4})\b")
+_UNIT_DAYS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30}
+
+
+def _words(text: str) -> Set[str]:
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _canonical_url(url: str) -> str:
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url
+    return (parsed.netloc.replace("www.", "") + parsed.path.rstrip("/")).lower()
+
+
+def story_key(item: Dict[str, Any]) -> str:
+    # Stable identity for one article: its URL without scheme/query, else its headline.
+    url = _canonical_url(item.get("url", ""))
+    return url or " ".join(sorted(_words(item.get("title", ""))))
+
+
+def published_at(item: Dict[str, Any], now: Optional[datetime] = None) -> Optional[datetime]:
+    # News results carry an ISO date; text results only hint at one in the snippet.
+    now = now or datetime.utcnow()
+    date = item.get("date")
+    if date:
+        try:
+            return datetime.fromisoformat(str(date).replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            pass
+    snippet = item.get("snippet", "")
+    match = _RELATIVE_DATE_RE.search(snippet)
+    if match:
+        return now - timedelta(days=int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()])
+    match = _ABSOLUTE_DATE_RE.search(snippet)
+    if match:
+        try:
+            return datetime.strptime(" ".join(match.groups()), "%b %d %Y")
+        except ValueError:
+            pass
+    return None
+
+
+def dedupe(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drops repeated URLs and near-identical headlines, keeping the first (best) copy."""
+    kept: List[Dict[str, Any]] = []
+    seen_urls: Set[str] = set()
+    seen_titles: List[Set[str]] = []
+    for item in items:
+        url = _canonical_url(item.get("url", ""))
+        if url and url in seen_urls:
+            continue
+        title = _words(item.get("title", ""))
+        if title and any(len(title & other) / len(title | other) >= DUPLICATE_SIMILARITY for other in seen_titles):
+            continue
+        if url:
+            seen_urls.add(url)
+        if title:
+            seen_titles.append(title)
+        kept.append(item)
+    return kept
+
+
+def rank(items: List[Dict[str, Any]], ticker: str = "", company_name: str = "") -> List[Dict[str, Any]]:
+    """Orders evidence by mentions of the ticker or company, weighted by recency."""
+    now = datetime.utcnow()
+    names = {ticker.lower().split(".")[0]} if ticker else set()
+    names |= _words(company_name) - {"inc", "corp", "corporation", "ltd", "plc", "co", "company", "holdings"}
+
+    def score(item: Dict[str, Any]) -> float:
+        title, snippet = _words(item.get("title", "")), _words(item.get("snippet", ""))
+        relevance = 1.0 + 2.0 * len(names & title) + len(names & snippet)
+        published = published_at(item, now)
+        if published is None:
+            return relevance * 0.5
+        age = max((now - published).total_seconds() / 86400, 0.0)
+        return relevance * math.pow(0.5, age / RECENCY_HALF_LIFE)
+
+    return sorted(items, key=score, reverse=True)
+
+
+def truncate(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(",;:.") + "…"
+
+
+def prepare(items: List[Dict[str, Any]], ticker: str = "", company_name: str = "") -> List[Dict[str, Any]]:
+    # Dedupe before ranking so the surviving copy is the earliest-listed one.
+    ranked = rank(dedupe(items), ticker, company_name)
+    return [{**item, "id": i + 1} for i, item in enumerate(ranked)]
+
+
+def prompt_evidence(evidence: List[Dict[str, Any]], token_budget: int = EVIDENCE_TOKEN_BUDGET) -> str:
+    """Compact one-line-per-item evidence for the draft prompt, snippets cut to the token budget."""
+    if not evidence:
+        return "none"
+    per_item = max(token_budget * 4 // len(evidence), 80)
+    lines = []
+    for ev in evidence:
+        meta = ", ".join(v for v in (ev.get("ticker"), ev.get("source"), ev.get("date")) if v)
+        line = f"[{ev.get('id')}] {ev.get('title', '')}"
+        if meta:
+            line += f" ({meta})"
+        snippet = truncate(ev.get("snippet", ""), per_item)
+        if snippet:
+            line += f": {snippet}"
+        if ev.get("url"):
+            line += f" <{ev['url']}>"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def evidence_bullets(evidence: List[Dict[str, Any]], limit: int = 3) -> List[str]:
+    bullets = []
+    for ev in evidence[:limit]:
+        text = f"{ev.get('title', 'News item')}: {truncate(ev.get('snippet', ''), 240)}"
+        bullets.append(f"{text} (source: {ev['url']})" if ev.get("url") else text)
+    return bullets
@@ -1,11 +1,31 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from .models import AnalystState
+from .state import AnalystState
+from .metrics import track_node
 from .nodes import (
-    supervisor_node, intake_guard_node, llm_frame_node, 
+    supervisor_node, intake_guard_node, resolve_ticker_node, llm_frame_node,
     web_crawler_node, yfinance_node, score_and_shortlist_node,
-    draft_writer_node, validation_node, on_validation_fail
+    draft_writer_node, validation_node, on_validation_fail,
+    asupervisor_node, aresolve_ticker_node, allm_frame_node,
+    aweb_crawler_node, ayfinance_node, adraft_writer_node
 )
 
+def _node(name, func, afunc=None):
+    # graph.invoke runs func; graph.ainvoke / astream run the native async afunc.
+    # Both are timed under the graph node name.
+    def run(state):
+        with track_node(name):
+            return func(state)
+
+    if afunc is None:
+        return RunnableLambda(run, name=func.__name__)
+
+    async def arun(state):
+        with track_node(name):
+            return await afunc(state)
+
+    return RunnableLambda(run, afunc=arun, name=func.__name__)
+
 def supervisor_router(state: AnalystState) -> str:
     return state.get("route", "WEB")
 
@@ -17,15 +37,16 @@ def retry_router(state: AnalystState) -> str:
 
 workflow = StateGraph(AnalystState)
 
-workflow.add_node("supervisor", supervisor_node)
-workflow.add_node("intake_guard", intake_guard_node)
-workflow.add_node("frame", llm_frame_node)
-workflow.add_node("web", web_crawler_node)
-workflow.add_node("yfinance", yfinance_node)
-workflow.add_node("score", score_and_shortlist_node)
-workflow.add_node("draft", draft_writer_node)
-workflow.add_node("validate", validation_node)
-workflow.add_node("on_fail", on_validation_fail)
+workflow.add_node("supervisor", _node("supervisor", supervisor_node, asupervisor_node))
+workflow.add_node("intake_guard", _node("intake_guard", intake_guard_node))
+workflow.add_node("resolve", _node("resolve", resolve_ticker_node, aresolve_ticker_node))
+workflow.add_node("frame", _node("frame", llm_frame_node, allm_frame_node))
+workflow.add_node("web", _node("web", web_crawler_node, aweb_crawler_node))
+workflow.add_node("yfinance", _node("yfinance", yfinance_node, ayfinance_node))
+workflow.add_node("score", _node("score", score_and_shortlist_node))
+workflow.add_node("draft", _node("draft", draft_writer_node, adraft_writer_node))
+workflow.add_node("validate", _node("validate", validation_node))
+workflow.add_node("on_fail", _node("on_fail", on_validation_fail))
 
 workflow.set_entry_point("supervisor")
 
@@ -34,18 +55,21 @@ workflow.add_conditional_edges(
     supervisor_router,
     {
         "INTAKE": "intake_guard",
-        "WEB": "frame",
-        "LLM": "frame",
-        "DOC": "frame",
-        "YFINANCE": "frame"
+        "WEB": "resolve",
+        "LLM": "resolve",
+        "DOC": "resolve",
+        "YFINANCE": "resolve"
     }
 )
 
 workflow.add_edge("intake_guard", END)
 
-workflow.add_edge("frame", "web")
-workflow.add_edge("web", "yfinance")
-workflow.add_edge("yfinance", "score")
+# Fan out: frame (LLM), web (DuckDuckGo) and yfinance are independent, so they
+# run in the same superstep and score waits for all three.
+workflow.add_edge("resolve", "frame")
+workflow.add_edge("resolve", "web")
+workflow.add_edge("resolve", "yfinance")
+workflow.add_edge(["frame", "web", "yfinance"], "score")
 workflow.add_edge("score", "draft")
 workflow.add_edge("draft", "validate")
 
@@ -55,6 +79,8 @@ workflow.add_conditional_edges(
     {"PASS": END, "FAIL": "on_fail"}
 )
 
-workflow.add_edge("on_fail", "supervisor")
+# Validation only checks the draft, so a retry re-runs just the draft writer
+# with the validation reasons; evidence, prices and score are kept.
+workflow.add_edge("on_fail", "draft")
 
 graph = workflow.compile()
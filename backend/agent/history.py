@@ -0,0 +1,295 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import yfinance as yf
+
+from .cache import SingleFlight
+from .metrics import track_call
+from .resilience import guarded
+
+# First download depth; later refreshes only request bars after the last one held.
+HISTORY_PERIOD = os.environ.get("HISTORY_PERIOD", "2y")
+# A series younger than this is used as-is.
+HISTORY_REFRESH = float(os.environ.get("HISTORY_REFRESH", "3600"))
+# Optional directory for .npz snapshots, so restarts do not re-download.
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "")
+# Adjusted bars are rebased after splits and dividends, so a series is re-downloaded in
+# full this often, and whenever re-fetched overlap bars disagree with the stored ones.
+HISTORY_FULL_REFRESH = float(os.environ.get("HISTORY_FULL_REFRESH", str(7 * 86400)))
+# Tickers held in memory; the least recently used series is dropped beyond it.
+HISTORY_CACHE_SIZE = int(os.environ.get("HISTORY_CACHE_SIZE", "512"))
+# Completed bars re-fetched on each incremental update to detect a changed basis.
+_OVERLAP_BARS = 5
+_BASIS_TOLERANCE = 1e-4
+
+DEFAULT_BENCHMARK = os.environ.get("HISTORY_BENCHMARK", "SPY")
+# Exchange suffix -> local market benchmark for beta.
+_SUFFIX_BENCHMARKS = {".TO": "^GSPTSE", ".V": "^GSPTSE"}
+
+TRADING_DAYS = 252
+_HORIZON_RE = re.compile(r"^\s*(\d+)\s*([dwmy])", re.I)
+_UNIT_DAYS = {"d": 1, "w": 5, "m": 21, "y": 252}
+MIN_BARS = 10
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+_PERIOD_RE = re.compile(r"^\s*(\d+)\s*(d|wk|mo|y)\s*$", re.I)
+_PERIOD_DAYS = {"d": 1, "wk": 7, "mo": 31, "y": 366}
+
+
+def period_days(period: str) -> Optional[int]:
+    # Calendar days in a yfinance period such as "2y" or "6mo"; None for "max" and "ytd".
+    match = _PERIOD_RE.match(period or "")
+    return int(match.group(1)) * _PERIOD_DAYS[match.group(2).lower()] if match else None
+
+
+class PriceSeries:
+    """Daily OHLCV bars as columnar NumPy arrays, oldest first. Instances are never mutated."""
+
+    __slots__ = ("dates",) + _COLUMNS
+
+    def __init__(self, dates: np.ndarray, **columns: np.ndarray):
+        self.dates = dates.astype("datetime64[D]")
+        for name in _COLUMNS:
+            setattr(self, name, np.asarray(columns[name], dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(np.array([], dtype="datetime64[D]"), **{c: np.array([]) for c in _COLUMNS})
+
+    @classmethod
+    def from_frame(cls, df: Any) -> "PriceSeries":
+        if df is None or getattr(df, "empty", True) or "Close" not in df:
+            return cls.empty()
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        dates = np.array(index, dtype="datetime64[D]")
+        columns = {
+            name: df[name.capitalize()].to_numpy(dtype=float) if name.capitalize() in df else np.full(len(df), np.nan)
+            for name in _COLUMNS
+        }
+        keep = ~np.isnan(columns["close"])
+        return cls(dates[keep], **{name: col[keep] for name, col in columns.items()})
+
+    def append(self, new: "PriceSeries") -> "PriceSeries":
+        # New bars win on overlapping dates: the last bar of the day is still forming.
+        if not len(new):
+            return self
+        if not len(self):
+            return new
+        keep = self.dates < new.dates[0]
+        return PriceSeries(
+            np.concatenate([self.dates[keep], new.dates]),
+            **{name: np.concatenate([getattr(self, name)[keep], getattr(new, name)]) for name in _COLUMNS}
+        )
+
+    def since(self, start: np.datetime64) -> "PriceSeries":
+        keep = self.dates >= start
+        if keep.all():
+            return self
+        return PriceSeries(self.dates[keep], **{name: getattr(self, name)[keep] for name in _COLUMNS})
+
+    def basis_changed(self, new: "PriceSeries") -> bool:
+        # True when bars both hold (other than our last, possibly still forming, one)
+        # have different closes: a split or dividend has re-adjusted the history.
+        if len(self) < 2 or not len(new):
+            return False
+        _, ai, bi = np.intersect1d(self.dates[:-1], new.dates, assume_unique=True, return_indices=True)
+        if not len(ai):
+            return True
+        old, fresh = self.close[ai], new.close[bi]
+        return bool(np.any(np.abs(fresh - old) > _BASIS_TOLERANCE * np.abs(old)))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"dates": self.dates, **{name: getattr(self, name) for name in _COLUMNS}}
+
+
+def horizon_days(horizon: str) -> int:
+    match = _HORIZON_RE.match(horizon or "")
+    if not match:
+        return 126
+    days = int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()]
+    return int(min(max(days, 21), 2 * TRADING_DAYS))
+
+
+def benchmark_for(ticker: str) -> str:
+    for suffix, benchmark in _SUFFIX_BENCHMARKS.items():
+        if ticker.upper().endswith(suffix):
+            return benchmark
+    return DEFAULT_BENCHMARK
+
+
+def compute_metrics(series: PriceSeries, benchmark: Optional[PriceSeries], horizon: str) -> Dict[str, Any]:
+    """Annualized volatility, max drawdown, momentum and beta over the horizon window."""
+    window = horizon_days(horizon)
+    close = series.close[-(window + 1):]
+    if len(close) < MIN_BARS:
+        return {}
+    log_close = np.log(close)
+    returns = np.diff(log_close)
+    running_peak = np.maximum.accumulate(close)
+    metrics: Dict[str, Any] = {
+        "window_days": int(len(returns)),
+        "volatility": float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+        "max_drawdown": float((close / running_peak - 1).min()),
+        "momentum": float(np.expm1(log_close[-1] - log_close[0])),
+        "beta": None,
+    }
+    if benchmark is not None and len(benchmark) >= MIN_BARS:
+        dates = series.dates[-(window + 1):]
+        _, ai, bi = np.intersect1d(dates, benchmark.dates, assume_unique=True, return_indices=True)
+        if len(ai) > MIN_BARS:
+            r = np.diff(np.log(close[ai]))
+            rb = np.diff(np.log(benchmark.close[bi]))
+            var = rb.var(ddof=1)
+            if var > 0:
+                metrics["beta"] = float(np.cov(r, rb, ddof=1)[0, 1] / var)
+    return metrics
+
+
+class HistoryStore:
+    """Per-ticker price history, downloaded once and then extended with only the new bars."""
+
+    def __init__(
+        self, directory: str = HISTORY_DIR, refresh_after: float = HISTORY_REFRESH,
+        full_refresh_after: float = HISTORY_FULL_REFRESH, maxsize: int = HISTORY_CACHE_SIZE
+    ):
+        self.directory = directory
+        self.refresh_after = refresh_after
+        self.full_refresh_after = full_refresh_after
+        self.maxsize = maxsize
+        self._series: "OrderedDict[str, PriceSeries]" = OrderedDict()
+        self._updated: Dict[str, float] = {}
+        # Wall-clock time of each series' last full download; persisted with the snapshot.
+        self._downloaded: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.full_downloads = 0
+        self.incremental_updates = 0
+        self.rebased = 0
+
+    def peek(self, ticker: str) -> Optional[PriceSeries]:
+        with self._lock:
+            return self._series.get(ticker.upper())
+
+    def needs_refresh(self, ticker: str, within: float = 0.0) -> bool:
+        # True when the series is missing or goes stale within `within` seconds.
+        with self._lock:
+            updated = self._updated.get(ticker.upper())
+        return updated is None or time.monotonic() - updated > self.refresh_after - within
+
+    def get(self, ticker: str) -> PriceSeries:
+        ticker = ticker.upper()
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is not None:
+                self._series.move_to_end(ticker)
+            fresh = time.monotonic() - self._updated.get(ticker, -1e18) < self.refresh_after
+        if series is not None and fresh:
+            return series
+        return self._flight.do(ticker, lambda: self._update(ticker))
+
+    def _update(self, ticker: str) -> PriceSeries:
+        series = self.peek(ticker)
+        with self._lock:
+            downloaded = self._downloaded.get(ticker, 0.0)
+        if series is None:
+            series, downloaded = self._load(ticker)
+        stock = yf.Ticker(ticker)
+        with track_call("yf_history"):
+            full = series is None or not len(series) or time.time() - downloaded > self.full_refresh_after
+            if not full:
+                start = str(series.dates[-min(_OVERLAP_BARS, len(series))])
+                new = PriceSeries.from_frame(guarded("yf_history", stock.history, start=start, auto_adjust=True))
+                if series.basis_changed(new):
+                    self.rebased += 1
+                    full = True
+                else:
+                    series = series.append(new)
+                    self.incremental_updates += 1
+            if full:
+                frame = guarded("yf_history", stock.history, period=HISTORY_PERIOD, auto_adjust=True)
+                series = PriceSeries.from_frame(frame)
+                downloaded = time.time()
+                self.full_downloads += 1
+        days = period_days(HISTORY_PERIOD)
+        if days is not None and len(series):
+            series = series.since(series.dates[-1] - np.timedelta64(days, "D"))
+        with self._lock:
+            self._series[ticker] = series
+            self._series.move_to_end(ticker)
+            self._updated[ticker] = time.monotonic()
+            self._downloaded[ticker] = downloaded
+            while len(self._series) > self.maxsize:
+                evicted, _ = self._series.popitem(last=False)
+                self._updated.pop(evicted, None)
+                self._downloaded.pop(evicted, None)
+        self._save(ticker, series, downloaded)
+        return series
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9._-]", "_", ticker) + ".npz")
+
+    def _load(self, ticker: str) -> Tuple[Optional[PriceSeries], float]:
+        # Snapshots written before downloaded_at was stored count as due for a full download.
+        if not self.directory:
+            return None, 0.0
+        try:
+            with np.load(self._path(ticker)) as data:
+                downloaded = float(data["downloaded_at"]) if "downloaded_at" in data.files else 0.0
+                return PriceSeries(data["dates"], **{name: data[name] for name in _COLUMNS}), downloaded
+        except (OSError, KeyError, ValueError):
+            return None, 0.0
+
+    def _save(self, ticker: str, series: PriceSeries, downloaded: float) -> None:
+        if not self.directory or not len(series):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(ticker) + ".tmp.npz"
+        np.savez(tmp, downloaded_at=np.float64(downloaded), **series.to_arrays())
+        os.replace(tmp, self._path(ticker))
+
+    def metrics(self, ticker: str, horizon: str) -> Dict[str, Any]:
+        series = self.get(ticker)
+        try:
+            benchmark: Optional[PriceSeries] = self.get(benchmark_for(ticker))
+        except Exception:
+            benchmark = None
+        return compute_metrics(series, benchmark, horizon)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._updated.clear()
+            self._downloaded.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tickers": len(self._series),
+            "maxsize": self.maxsize,
+            "bars": int(sum(len(s) for s in list(self._series.values()))),
+            "full_downloads": self.full_downloads,
+            "incremental_updates": self.incremental_updates,
+            "rebased": self.rebased,
+        }
+
+
+price_history = HistoryStore()
+
+
+def risk_metrics(tickers: List[str], horizon: str) -> Dict[str, Dict[str, Any]]:
+    out = {}
+    for ticker in tickers:
+        try:
+            out[ticker] = price_history.metrics(ticker, horizon)
+        except Exception:
+            out[ticker] = {}
+    return out
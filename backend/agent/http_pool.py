@@ -0,0 +1,307 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Tuple
+
+import httpx
+
+from .metrics import Gauge
+
+# One keep-alive pool per named client (yahoo, groq, ...), shared by every caller.
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "32"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+# Concurrent requests to one host; the rest wait for a slot instead of opening more connections.
+HTTP_PER_HOST = int(os.environ.get("HTTP_PER_HOST", "8"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "10"))
+# HTTP/2 needs the h2 package (httpx[http2]); without it the pools speak HTTP/1.1.
+HTTP2 = os.environ.get("HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+
+_ssl_lock = threading.Lock()
+_ssl_context = None
+
+
+def _ssl() -> Any:
+    # Loading the CA bundle costs ~100ms, so every pool shares one context.
+    global _ssl_context
+    with _ssl_lock:
+        if _ssl_context is None:
+            _ssl_context = httpx.create_ssl_context()
+        return _ssl_context
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+class PoolStats:
+    """Request, connection and per-host concurrency counts for one named client."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.opened = 0
+        self.waited = 0.0
+        self.in_flight: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+        self.pools: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._seen: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def started(self, host: str, waited: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.waited += waited
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+
+    def finished(self, host: str, pool: Any) -> None:
+        with self._lock:
+            self.in_flight[host] -= 1
+            # Connections not seen before were opened for this request (new TCP/TLS handshake).
+            for conn in pool.connections:
+                if conn not in self._seen:
+                    self._seen.add(conn)
+                    self.opened += 1
+
+    def connections(self) -> Tuple[int, int]:
+        conns = [c for pool in list(self.pools) for c in pool.connections]
+        return len(conns), sum(1 for c in conns if c.is_idle())
+
+    def snapshot(self) -> Dict[str, Any]:
+        open_, idle = self.connections()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.opened,
+                "open": open_,
+                "idle": idle,
+                "reuse_ratio": round(1 - self.opened / self.requests, 3) if self.requests else None,
+                "in_flight": {h: n for h, n in self.in_flight.items() if n},
+                "peak_in_flight": dict(self.peak),
+                "waited_seconds": round(self.waited, 3)
+            }
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class HostLimitedTransport(httpx.BaseTransport):
+    """Pooled transport that holds a per-host slot from request until the body is closed."""
+
+    def __init__(self, stats: PoolStats, per_host: int = HTTP_PER_HOST):
+        self._inner = httpx.HTTPTransport(verify=_ssl(), http2=HTTP2, limits=_limits())
+        self._stats = stats
+        self._per_host = per_host
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        stats.pools.add(self._inner._pool)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        with self._lock:
+            slot = self._slots.setdefault(host, threading.BoundedSemaphore(self._per_host))
+        start = time.perf_counter()
+        slot.acquire()
+        self._stats.started(host, time.perf_counter() - start)
+
+        def release() -> None:
+            self._stats.finished(host, self._inner._pool)
+            slot.release()
+
+        try:
+            response = self._inner.handle_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            response.status_code, headers=response.headers,
+            stream=_ReleasingStream(response.stream, release), extensions=response.extensions
+        )
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncHostLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, stats: PoolStats, per_host: int = HTTP_PER_HOST):
+        self._inner = httpx.AsyncHTTPTransport(verify=_ssl(), http2=HTTP2, limits=_limits())
+        self._stats = stats
+        self._per_host = per_host
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        stats.pools.add(self._inner._pool)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._slots.setdefault(host, asyncio.Semaphore(self._per_host))
+        start = time.perf_counter()
+        await slot.acquire()
+        self._stats.started(host, time.perf_counter() - start)
+
+        def release() -> None:
+            self._stats.finished(host, self._inner._pool)
+            slot.release()
+
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            response.status_code, headers=response.headers,
+            stream=_AsyncReleasingStream(response.stream, release), extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+_stats: Dict[str, PoolStats] = {}
+_stats_lock = threading.Lock()
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_lock = threading.Lock()
+
+
+def pool_stats_for(name: str) -> PoolStats:
+    with _stats_lock:
+        return _stats.setdefault(name, PoolStats(name))
+
+
+def new_client(name: str) -> httpx.Client:
+    # httpx sends Accept-Encoding: gzip, deflate (plus br/zstd when installed) and decodes responses.
+    return httpx.Client(transport=HostLimitedTransport(pool_stats_for(name)), timeout=HTTP_TIMEOUT)
+
+
+def new_async_client(name: str) -> httpx.AsyncClient:
+    # Bound to the first loop that uses it; for SDK clients that live as long as the process.
+    return httpx.AsyncClient(transport=AsyncHostLimitedTransport(pool_stats_for(name)), timeout=HTTP_TIMEOUT)
+
+
+def client(name: str) -> httpx.Client:
+    """Process-wide pooled sync client for `name`; safe to share across threads."""
+    try:
+        return _clients[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _clients:
+            _clients[name] = new_client(name)
+        return _clients[name]
+
+
+def _close_sockets(http: httpx.AsyncClient) -> None:
+    # The owner loop is gone or stopped, so aclose() cannot run there; release the
+    # file descriptors of the pooled connections directly instead.
+    pool = getattr(getattr(http._transport, "_inner", None), "_pool", None)
+    for conn in list(getattr(pool, "connections", [])):
+        stream = getattr(getattr(conn, "_connection", None), "_network_stream", None)
+        try:
+            sock = stream.get_extra_info("socket") if stream is not None else None
+            # asyncio hands out a TransportSocket wrapper; closing the socket object the
+            # transport itself holds keeps a later close from hitting a reused fd.
+            sock = getattr(sock, "_sock", sock)
+            if sock is not None:
+                sock.close()
+        except Exception:
+            pass
+
+
+def _discard(owner: asyncio.AbstractEventLoop, http: httpx.AsyncClient) -> None:
+    if not owner.is_closed() and owner.is_running():
+        asyncio.run_coroutine_threadsafe(http.aclose(), owner)
+    else:
+        _close_sockets(http)
+
+
+def async_client(name: str) -> httpx.AsyncClient:
+    """Pooled async client for `name` on the running loop (httpx connections are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(name)
+    if entry is None or entry[0] is not loop:
+        if entry is not None:
+            _discard(*entry)
+        entry = _async_clients[name] = (loop, new_async_client(name))
+    return entry[1]
+
+
+async def aclose() -> None:
+    loop = asyncio.get_running_loop()
+    for name, (owner, http) in list(_async_clients.items()):
+        if owner is loop:
+            del _async_clients[name]
+            await http.aclose()
+    with _lock:
+        sync_clients = list(_clients.values())
+        _clients.clear()
+    for http in sync_clients:
+        http.close()
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        named = list(_stats.values())
+    return {
+        "http2": HTTP2,
+        "per_host": HTTP_PER_HOST,
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "clients": {s.name: s.snapshot() for s in named}
+    }
+
+
+def _collect_connections() -> Dict[Tuple[str, ...], float]:
+    samples: Dict[Tuple[str, ...], float] = {}
+    with _stats_lock:
+        named = list(_stats.values())
+    for s in named:
+        open_, idle = s.connections()
+        samples[(s.name, "open")] = open_
+        samples[(s.name, "idle")] = idle
+        samples[(s.name, "in_flight")] = sum(s.in_flight.values())
+    return samples
+
+
+HTTP_CONNECTIONS = Gauge(
+    "finsight_http_connections", "Pooled outbound HTTP connections and in-flight requests by client.",
+    ["client", "state"], _collect_connections
+)
@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .metrics import Counter
+from .resilience import UpstreamLimits, use_executor, use_limits
+
+BATCH_DB = os.environ.get("BATCH_DB", "batch_jobs.db")
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+# Threads for the blocking upstream calls of batch items. Separate from the interactive
+# I/O pool, because batch calls can sit on an upstream slot while holding a thread.
+BATCH_IO_WORKERS = int(os.environ.get("BATCH_IO_WORKERS", "8"))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "50"))
+# Per-item data budget; longer than /analyze's because items queue for upstream slots.
+BATCH_LATENCY_BUDGET = float(os.environ.get("BATCH_LATENCY_BUDGET", "60"))
+# Seconds a worker process holds a running item without renewing its claim. Live
+# runners renew every third of it; items of a crashed process are taken over after it.
+BATCH_LEASE = float(os.environ.get("BATCH_LEASE", "120"))
+# Concurrent upstream calls across all batch items; interactive requests are not limited.
+BATCH_LIMITS = {
+    "groq": int(os.environ.get("BATCH_LIMIT_GROQ", "2")),
+    "ddgs": int(os.environ.get("BATCH_LIMIT_DDGS", "2")),
+    "yahoo": int(os.environ.get("BATCH_LIMIT_YAHOO", "4")),
+}
+
+BATCH_ITEMS = Counter("finsight_batch_items_total", "Finished batch analysis items by outcome.", ["outcome"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    finished_at REAL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    seq INTEGER,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+class JobStore:
+    """Batch jobs and their items in SQLite; each item is written as soon as it finishes."""
+
+    def __init__(self, path: str = BATCH_DB, lease: float = BATCH_LEASE):
+        self.path = path
+        self.lease = lease
+        # Identifies this process's claims; several workers may share the file.
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_items)")}
+        for column, kind in (("claimed_by", "TEXT"), ("claimed_at", "REAL"), ("seq", "INTEGER")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE job_items ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_items_seq ON job_items (seq)")
+        self._conn.commit()
+
+    def create(self, questions: List[str], profile: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, profile, created_at) VALUES (?, ?, ?)", (job_id, json.dumps(profile), time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, idx, question, status) VALUES (?, ?, ?, 'queued')",
+                [(job_id, i, q) for i, q in enumerate(questions)]
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self, job_id: str, idx: int) -> bool:
+        # Compare-and-set: a queued item, or a running one whose lease has lapsed,
+        # goes to exactly one of the processes sharing the file.
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE job_items SET status = 'running', claimed_by = ?, claimed_at = ? WHERE job_id = ? AND idx = ? "
+                "AND (status = 'queued' OR (status = 'running' AND (claimed_at IS NULL OR claimed_at < ?)))",
+                (self.owner, now, job_id, idx, now - self.lease)
+            )
+            self._conn.commit()
+        return cur.rowcount == 1
+
+    def renew(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE job_items SET claimed_at = ? WHERE claimed_by = ? AND status = 'running'", (time.time(), self.owner)
+            )
+            self._conn.commit()
+
+    def finish(self, job_id: str, idx: int, result: Optional[Dict[str, Any]] = None, error: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            # seq is assigned under the write lock, so it follows commit order across
+            # processes; streams page by it rather than by the (unordered) timestamps.
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_items) WHERE job_id = ? AND idx = ?",
+                ("error" if error else "done", json.dumps(result, default=str) if result is not None else None,
+                 error or None, now, job_id, idx)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET finished_at = ? WHERE id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('queued', 'running'))",
+                (now, job_id, job_id)
+            )
+            self._conn.commit()
+
+    def pending(self, include_queued: bool = True) -> List[Dict[str, Any]]:
+        # Items a crash or restart left unfinished, oldest job first. Running items
+        # are only returned once their lease has lapsed.
+        statuses = "('queued', 'running')" if include_queued else "('running')"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT i.job_id, i.idx, i.question, j.profile FROM job_items i JOIN jobs j ON j.id = i.job_id "
+                f"WHERE i.status IN {statuses} AND (i.status = 'queued' OR i.claimed_at IS NULL OR i.claimed_at < ?) "
+                "ORDER BY j.created_at, i.idx",
+                (time.time() - self.lease,)
+            ).fetchall()
+        return [{"job_id": r[0], "idx": r[1], "question": r[2], "profile": json.loads(r[3])} for r in rows]
+
+    def get(self, job_id: str, after_seq: int = 0, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._conn.execute("SELECT created_at, finished_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT idx, question, status, result, error, finished_at, seq FROM job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,)
+            ).fetchall()
+        counts: Dict[str, int] = {}
+        for row in rows:
+            counts[row[2]] = counts.get(row[2], 0) + 1
+        items = []
+        for idx, question, status, result, error, finished_at, seq in rows:
+            # Items finished at or before `after_seq` are left out, for incremental polling.
+            if seq is not None and seq <= after_seq:
+                continue
+            item: Dict[str, Any] = {"index": idx, "question": question, "status": status}
+            if include_results and result is not None:
+                item["result"] = json.loads(result)
+            if error:
+                item["error"] = error
+            if finished_at is not None:
+                item["finished_at"] = finished_at
+                item["seq"] = seq
+            items.append(item)
+        return {
+            "job_id": job_id,
+            "status": "done" if job[1] is not None else "running",
+            "created_at": job[0],
+            "finished_at": job[1],
+            "total": len(rows),
+            "counts": counts,
+            "items": items,
+        }
+
+
+class BatchRunner:
+    """Fixed pool of async workers draining batch items, with shared per-upstream limits."""
+
+    def __init__(
+        self, store: JobStore, run_item: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        workers: int = BATCH_WORKERS, limits: Optional[Dict[str, int]] = None
+    ):
+        self.store = store
+        self.run_item = run_item
+        self.workers = workers
+        self.limits = UpstreamLimits(limits or BATCH_LIMITS)
+        self.executor = ThreadPoolExecutor(max_workers=BATCH_IO_WORKERS, thread_name_prefix="finsight-batch")
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    def start(self) -> None:
+        # Also called lazily on submit, for servers started without lifespan events.
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._enqueue(self.store.pending())
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._keep_leases()))
+
+    def _enqueue(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            self._queue.put_nowait((item["job_id"], item["idx"], item["question"], item["profile"]))
+
+    async def _keep_leases(self) -> None:
+        # Renews this process's claims and takes over items whose runner died.
+        while True:
+            await asyncio.sleep(self.store.lease / 3)
+            try:
+                await asyncio.to_thread(self.store.renew)
+                self._enqueue(await asyncio.to_thread(self.store.pending, False))
+            except sqlite3.Error:
+                pass
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, questions: List[str], profile: Dict[str, Any]) -> str:
+        self.start()
+        job_id = await asyncio.to_thread(self.store.create, questions, profile)
+        for i, question in enumerate(questions):
+            self._queue.put_nowait((job_id, i, question, profile))
+        return job_id
+
+    async def _worker(self) -> None:
+        use_limits(self.limits)
+        use_executor(self.executor)
+        while True:
+            job_id, idx, question, profile = await self._queue.get()
+            try:
+                # Both are write transactions that can wait on another process's lock.
+                if not await asyncio.to_thread(self.store.claim, job_id, idx):
+                    # Another worker process took it, or it is already done.
+                    continue
+                try:
+                    result = await self.run_item(question, profile)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await asyncio.to_thread(self.store.finish, job_id, idx, error=str(e) or type(e).__name__)
+                    BATCH_ITEMS.inc(outcome="error")
+                else:
+                    await asyncio.to_thread(self.store.finish, job_id, idx, result=result)
+                    BATCH_ITEMS.inc(outcome="done")
+                self._notify(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> bool:
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self._tasks else 0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **self.limits.stats()
+        }
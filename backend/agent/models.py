@@ -1,44 +1,17 @@
-from typing import TypedDict, Literal, List, Dict, Any, Optional
-from langchain_core.messages import BaseMessage
-from pydantic import BaseModel
+from typing import Literal, List
+from pydantic import BaseModel, Field
 
-# --- Domain Models ---
+# --- Draft Output ---
 
-class UserProfile(TypedDict, total=False):
-    budget: float
-    risk_level: Literal["low", "medium", "high"]
-    horizon: str
-    country: str
-
-class ValidationResult(TypedDict, total=False):
-    status: Literal["PASS", "FAIL"]
-    reasons: List[str]
-    suggested_route: Literal["WEB", "LLM", "DOC", "YFINANCE", "INTAKE"]
-
-class AnalystState(TypedDict, total=False):
-    messages: List[BaseMessage]
-    
-    # Decisions
-    route: Literal["WEB", "LLM", "DOC", "YFINANCE", "INTAKE"]
-    plan: str
-    
-    # Data
-    user_profile: UserProfile
-    missing_fields: List[str]
-    web_evidence: List[Dict[str, Any]]
-    price_data: Dict[str, Any]
-    fundamentals: Dict[str, Any]
-    last_quarter: Dict[str, Any]
-    
-    # Outputs
-    frame: str
-    draft: str
-    shortlist: List[Dict[str, Any]]
-    validation: ValidationResult
-    
-    # Retry logic
-    retry_count: int
-    reminder: str
+class DraftReport(BaseModel):
+    """Analyst report for the question; every list item is 1-2 descriptive sentences."""
+    executive_summary: str = Field(description="Recommendation (YES/NO), expected growth strength (High/Medium/Low) and comma-separated risk points. No source links.")
+    expected_return: str = Field(description="Expected % return range for the selected horizon.")
+    news_summary: List[str] = Field(description="What the recent news says, each item ending with (source: URL).")
+    bull_case: List[str] = Field(description="Reasons the stock could outperform.")
+    bear_case: List[str] = Field(description="Reasons the stock could underperform.")
+    key_risks: List[str] = Field(description="Specific risks to watch.")
+    last_quarter_result: str = Field(description="Summary of the most recent quarterly results.")
 
 # --- API Models ---
 
@@ -50,3 +23,9 @@ class ProfileRequest(BaseModel):
 class AnalyzeRequest(BaseModel):
     question: str
     profile: ProfileRequest
+
+class BatchRequest(BaseModel):
+    # Tickers become a standard buy/hold question each; both lists may be combined.
+    questions: List[str] = []
+    tickers: List[str] = []
+    profile: ProfileRequest
@@ -0,0 +1,168 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .evidence import story_key
+
+# Local news evidence store; ":memory:" keeps it per process.
+NEWS_STORE_DB = os.environ.get("NEWS_STORE_DB", "news_evidence.db")
+# A ticker searched more recently than this is answered from the store.
+NEWS_REUSE_SECONDS = float(os.environ.get("NEWS_REUSE_SECONDS", os.environ.get("NEWS_CACHE_TTL", "900")))
+# Articles older than this (by fetch time) are purged.
+NEWS_RETENTION_DAYS = float(os.environ.get("NEWS_RETENTION_DAYS", "14"))
+# How many stored articles per ticker the analysis ranks from.
+NEWS_WINDOW = int(os.environ.get("NEWS_WINDOW", "20"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    story TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    snippet TEXT NOT NULL,
+    source TEXT NOT NULL,
+    published TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    UNIQUE (ticker, story)
+);
+CREATE INDEX IF NOT EXISTS articles_ticker ON articles (ticker, fetched_at);
+CREATE TABLE IF NOT EXISTS searches (ticker TEXT PRIMARY KEY, searched_at REAL NOT NULL);
+"""
+
+# External-content FTS index kept in sync by triggers.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, snippet, content='articles', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, snippet) VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO articles_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+"""
+
+_COLUMNS = "ticker, title, url, snippet, source, published, fetched_at"
+
+
+class NewsStore:
+    """Normalized news evidence per ticker, with fetch times and a full-text index."""
+
+    def __init__(self, path: str = NEWS_STORE_DB):
+        self.path = path
+        self.searches = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: keyword queries fall back to LIKE.
+            self.fts = False
+        self._conn.commit()
+
+    def searched_at(self, ticker: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT searched_at FROM searches WHERE ticker = ?", (ticker.upper(),)).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, ticker: str, min_remaining: float = 0.0) -> bool:
+        searched = self.searched_at(ticker)
+        return searched is not None and time.time() - searched < NEWS_REUSE_SECONDS - min_remaining
+
+    def mark_reused(self) -> None:
+        with self._lock:
+            self.reused += 1
+
+    def add(self, ticker: str, items: List[Dict[str, Any]]) -> None:
+        ticker, now = ticker.upper(), time.time()
+        rows = [
+            (ticker, story_key(item), item.get("title", ""), item.get("url", ""), item.get("snippet", ""),
+             item.get("source", ""), item.get("date", ""), now)
+            for item in items if item.get("title") or item.get("url")
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO articles (ticker, story, title, url, snippet, source, published, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (ticker, story) DO UPDATE SET title = excluded.title, snippet = excluded.snippet, "
+                "fetched_at = excluded.fetched_at, published = COALESCE(NULLIF(excluded.published, ''), published)",
+                rows
+            )
+            self._conn.execute("INSERT OR REPLACE INTO searches (ticker, searched_at) VALUES (?, ?)", (ticker, now))
+            self._conn.commit()
+        self.searches += 1
+
+    def recent(self, ticker: str, limit: int = NEWS_WINDOW) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM articles WHERE ticker = ? "
+                "ORDER BY published DESC, fetched_at DESC, id LIMIT ?",
+                (ticker.upper(), limit)
+            ).fetchall()
+        return [self._item(row) for row in rows]
+
+    def search(self, query: str, ticker: Optional[str] = None, limit: int = NEWS_WINDOW) -> List[Dict[str, Any]]:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return self.recent(ticker, limit) if ticker else []
+        if self.fts:
+            where = "articles_fts MATCH ?"
+            args: List[Any] = [" ".join(f'"{t}"' for t in terms)]
+            columns = ", ".join(f"articles.{c}" for c in _COLUMNS.split(", "))
+            sql = f"SELECT {columns} FROM articles_fts JOIN articles ON articles.id = articles_fts.rowid WHERE "
+            order = "bm25(articles_fts)"
+        else:
+            where = " AND ".join("(title || ' ' || snippet) LIKE ?" for _ in terms)
+            args = [f"%{t}%" for t in terms]
+            sql = f"SELECT {_COLUMNS} FROM articles WHERE "
+            order = "published DESC"
+        if ticker:
+            where += " AND ticker = ?"
+            args.append(ticker.upper())
+        with self._lock:
+            rows = self._conn.execute(f"{sql}{where} ORDER BY {order} LIMIT ?", (*args, limit)).fetchall()
+        return [self._item(row) for row in rows]
+
+    @staticmethod
+    def _item(row) -> Dict[str, Any]:
+        ticker, title, url, snippet, source, published, fetched_at = row
+        return {
+            "title": title, "url": url, "snippet": snippet, "source": source,
+            "date": published, "ticker": ticker, "fetched_at": fetched_at
+        }
+
+    def purge(self, older_than_days: float = NEWS_RETENTION_DAYS) -> int:
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM articles WHERE fetched_at < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM searches WHERE searched_at < ?", (cutoff,))
+            self._conn.commit()
+        return deleted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM articles")
+            self._conn.execute("DELETE FROM searches")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            articles, tickers = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT ticker) FROM articles").fetchone()
+        return {
+            "path": self.path, "articles": articles, "tickers": tickers, "fts": self.fts,
+            "searches": self.searches, "reused": self.reused
+        }
+
+
+news_store = NewsStore()
@@ -1,18 +1,36 @@
+import asyncio
+import contextvars
+import functools
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Literal, List, Dict, Any, Tuple
+from typing import Literal, List, Dict, Any, Tuple, Callable, Optional, Awaitable
 from urllib.parse import urlparse
 
-import requests
+import numpy as np
 import yfinance as yf
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_groq import ChatGroq
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
-from .models import AnalystState
+from langchain_core.utils.json import parse_partial_json
+from .models import DraftReport
+from .state import AnalystState
+from .clients import clients
+from .cache import SQLiteCache, TieredCache, SingleFlight
+from . import shared_cache
+from .quotes import fetch_quotes, get_quote, quote_stats
+from .router import classify_route
+from .metrics import track_call
+from .callbacks import llm_usage_handler
+from .resilience import (
+    arate_limited, aupstream_slot, blocking_executor, guarded, hedged, rate_limited, time_left, upstream_slot
+)
+from .history import price_history, risk_metrics
+from .evidence import dedupe, evidence_bullets, prepare, prompt_evidence, published_at
+from .news_store import NEWS_WINDOW, news_store
 
 # --- Setup ---
 # Use a default key or expect one in env. Ideally user provides one.
@@ -22,12 +40,60 @@ if not api_key:
     # For demo, we assume user will provide it.
     pass
 
-# Allow model override via env to avoid deprecations.
-model_name = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
-model = ChatGroq(model=model_name, temperature=0)
+# The Groq model and the DuckDuckGo wrapper come from the shared client registry
+# (GROQ_MODEL overrides the model); both are built on first use.
+def _llm():
+    # Resolved per chain build so a swapped-in model is instrumented too.
+    return clients.get("llm").with_config(callbacks=[llm_usage_handler])
 
-# Search setup
-wrapper = DuckDuckGoSearchAPIWrapper(max_results=5)
+# Groq calls take an upstream slot, so batch jobs stay within their Groq concurrency,
+# and go through its rate limit (off unless RATE_GROQ is set). The latency budget
+# covers data gathering only, so it does not bound the wait here.
+def _groq(call: Callable[[], Any]) -> Any:
+    with upstream_slot("groq"):
+        return rate_limited("groq", call, use_budget=False)
+
+async def _agroq(call: Callable[[], Awaitable[Any]]) -> Any:
+    async with aupstream_slot("groq"):
+        return await arate_limited("groq", call, use_budget=False)
+
+# yfinance and ddgs only offer blocking APIs; async nodes run them on this
+# bounded pool so a burst of requests cannot spawn unbounded threads.
+_io_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("IO_WORKERS", "16")),
+    thread_name_prefix="finsight-io"
+)
+
+# Market data cache. Each data class has its own TTL and key namespace, so a
+# days-old quarterly entry can never be read back as a live price.
+MARKET_TTLS = {
+    "price": float(os.environ.get("PRICE_CACHE_TTL", "15")),
+    "info": float(os.environ.get("INFO_CACHE_TTL", str(6 * 3600))),
+    "earnings": float(os.environ.get("EARNINGS_CACHE_TTL", str(3 * 86400))),
+}
+# MARKET_CACHE_DB keeps market data in its own SQLite file, whatever CACHE_BACKEND is.
+_market_cache_db = os.environ.get("MARKET_CACHE_DB")
+_market_cache = shared_cache.tiered(
+    "market", int(os.environ.get("MARKET_CACHE_SIZE", "4096")), MARKET_TTLS["price"],
+    SQLiteCache(_market_cache_db) if _market_cache_db else None
+)
+
+# Symbol resolution cache: company query -> (ticker, company name).
+_symbol_cache = shared_cache.tiered(
+    "symbols", int(os.environ.get("SYMBOL_CACHE_SIZE", "2048")), float(os.environ.get("SYMBOL_CACHE_TTL", "86400"))
+)
+
+# News search results by normalized query. Always NEWS_RESULTS deep, so the
+# 3-per-ticker comparison lookups reuse single-ticker entries; the extra depth
+# leaves room for dropping duplicates before the top items are kept.
+NEWS_RESULTS = int(os.environ.get("NEWS_RESULTS", "8"))
+_news_cache = shared_cache.tiered(
+    "news", int(os.environ.get("NEWS_CACHE_SIZE", "1024")), float(os.environ.get("NEWS_CACHE_TTL", "900"))
+)
+
+# Identical in-flight upstream calls (same source and normalized arguments)
+# share one execution, so a burst on one ticker costs one call per key.
+_flight = SingleFlight()
 
 # --- Helpers ---
 def _get_last_user_text(state: AnalystState) -> str:
@@ -38,18 +104,23 @@ def _get_last_user_text(state: AnalystState) -> str:
 
 _COMMON_WORDS = {
     "I", "A", "AN", "THE", "SHOULD", "INVEST", "IN", "BUY", "SELL",
-    "FOR", "IS", "IT", "NOW", "STOCK", "SHARES", "PRICE", "ANALYZE"
+    "FOR", "IS", "IT", "NOW", "STOCK", "SHARES", "PRICE", "ANALYZE",
+    "VS", "OR", "AND"
 }
 
+# Comparison mode needs two or more tickers plus an explicit comparison cue.
+_COMPARE_RE = re.compile(r"\b(vs\.?|versus|compare[ds]?|or|and|against)\b|[,/]", re.IGNORECASE)
+MAX_COMPARE = int(os.environ.get("MAX_COMPARE_TICKERS", "5"))
+
 def _extract_ticker(question: str) -> str:
-    match = re.search(r"\$([A-Z]{1,5})\b", question)
-    if match:
-        return match.group(1)
-    match = re.search(r"\(([A-Z]{1,5})\)", question)
-    if match:
-        return match.group(1)
+    tickers = _extract_tickers(question)
+    return tickers[0] if tickers else ""
+
+def _extract_tickers(question: str) -> List[str]:
+    # Same precedence as before: $TICKER, then (TICKER), then bare upper-case tokens.
+    tickers = re.findall(r"\$([A-Z]{1,5})\b", question)
+    tickers += re.findall(r"\(([A-Z]{1,5})\)", question)
     raw_tokens = [t.strip(".,!?()[]{}") for t in question.split()]
-    tickers = []
     for raw in raw_tokens:
         if not raw.isalpha():
             continue
@@ -60,7 +131,7 @@ def _extract_ticker(question: str) -> str:
         if raw in _COMMON_WORDS:
             continue
         tickers.append(raw)
-    return tickers[0] if tickers else ""
+    return list(dict.fromkeys(tickers))
 
 def _resolve_ticker_and_name(question: str) -> Tuple[str, str]:
     ticker = _extract_ticker(question)
@@ -76,50 +147,202 @@ def _resolve_ticker_and_name(question: str) -> Tuple[str, str]:
             lower_stop = {w.lower() for w in _COMMON_WORDS}
             filtered = [w for w in words if w.lower() not in lower_stop]
             company_query = filtered[-1] if filtered else max(words, key=len)
+    search_query = company_query or question
+    cache_key = search_query.strip().lower()
+    cached = _symbol_cache.get(cache_key)
+    if cached is not None:
+        # A shared tier returns the pair as a JSON list.
+        return tuple(cached)
     search_cls = getattr(yf, "Search", None)
     if search_cls:
         try:
-            search = search_cls(company_query or question)
-            quotes = getattr(search, "quotes", [])
-            if quotes:
-                first = quotes[0]
-                return first.get("symbol", ""), first.get("shortname", "") or first.get("longname", "")
+            quotes = _flight.do(
+                ("yf_search", cache_key),
+                lambda: _tracked("yf_search", lambda: getattr(search_cls(search_query), "quotes", []))
+            )
         except Exception:
             return "", ""
+        resolved = ("", "")
+        if quotes:
+            first = quotes[0]
+            resolved = (first.get("symbol", ""), first.get("shortname", "") or first.get("longname", ""))
+        _symbol_cache.set(cache_key, resolved)
+        return resolved
     return "", ""
 
+def _tracked(source: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with track_call(source):
+        return guarded(source, fn, *args, **kwargs)
+
+async def _run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(blocking_executor(_io_executor), functools.partial(ctx.run, fn, *args, **kwargs))
+
+def _map_blocking(fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    # One context copy per task: a Context cannot be entered by two threads at once.
+    contexts = [contextvars.copy_context() for _ in items]
+    return list(blocking_executor(_io_executor).map(lambda ctx, item: ctx.run(fn, item), contexts, items))
+
 def _fetch_quote_yahoo(ticker: str) -> Dict[str, Any]:
     try:
-        resp = requests.get(
-            "https://query1.finance.yahoo.com/v7/finance/quote",
-            params={"symbols": ticker},
-            timeout=10
+        return guarded("yahoo_quote", fetch_quotes, [ticker]).get(ticker.upper(), {})
+    except Exception:
+        return {}
+
+async def _afetch_quote_yahoo(ticker: str) -> Dict[str, Any]:
+    # Goes through the batcher, so concurrent fallbacks share one multi-symbol request.
+    # The batcher owns the circuit breaker; this caller only bounds its own wait.
+    try:
+        return await asyncio.wait_for(get_quote(ticker), time_left("yahoo_quote"))
+    except Exception:
+        return {}
+
+def _market_data(data_class: str, ticker: str, fetch: Callable[[str], Any]) -> Any:
+    key = f"{data_class}:{ticker.upper()}"
+    return _flight.do(
+        (f"yf_{data_class}", ticker.upper()),
+        lambda: _market_cache.get_or_fetch(
+            key, lambda: guarded(f"yf_{data_class}", fetch, ticker), ttl=MARKET_TTLS[data_class]
         )
-        resp.raise_for_status()
-        data = resp.json()
-        results = data.get("quoteResponse", {}).get("result", [])
-        if not results:
-            return {}
-        q = results[0]
-        price = q.get("regularMarketPrice")
-        prev_close = q.get("regularMarketPreviousClose")
-        change_pct = None
-        if price is not None and prev_close:
-            try:
-                change_pct = ((price - prev_close) / prev_close) * 100
-            except Exception:
-                change_pct = None
-        return {
-            "currency": q.get("currency", "USD"),
-            "current_price": price,
-            "change_1d_pct": change_pct,
-            "source": "yahoo_finance",
-            "ticker": q.get("symbol", ticker),
-            "company_name": q.get("longName") or q.get("shortName") or ticker
-        }
+    )
+
+def _yf_price(ticker: str) -> Optional[Dict[str, Any]]:
+    stock = yf.Ticker(ticker)
+    with track_call("yf_price"):
+        fast = getattr(stock, "fast_info", {}) or {}
+        last_price = fast.get("last_price") or fast.get("lastPrice") or fast.get("regular_market_price")
+        prev_close = fast.get("previous_close") or fast.get("previousClose")
+    if last_price is None:
+        try:
+            with track_call("yf_history"):
+                history = stock.history(period="5d")
+            if not history.empty and "Close" in history:
+                closes = history["Close"].dropna()
+                if len(closes) >= 2:
+                    last_price = float(closes.iloc[-1])
+                    prev_close = float(closes.iloc[-2])
+        except Exception:
+            pass
+    if last_price is None:
+        return None
+    return {"last_price": float(last_price), "prev_close": float(prev_close) if prev_close else None}
+
+def _yf_info(ticker: str) -> Dict[str, Any]:
+    # Only slow-moving fields; prices from .info would go stale under the hours-long TTL.
+    with track_call("yf_info"):
+        info = yf.Ticker(ticker).info or {}
+    return {"currency": info.get("currency", "USD"), "long_name": info.get("longName")}
+
+def _yf_last_quarter(ticker: str) -> Dict[str, Any]:
+    with track_call("yf_earnings"):
+        qe = yf.Ticker(ticker).quarterly_earnings
+    if not hasattr(qe, "empty") or qe.empty:
+        return {}
+    last_row = qe.iloc[-1]
+    period = qe.index[-1]
+    if hasattr(period, "to_pydatetime"):
+        period = period.to_pydatetime().strftime("%Y-%m-%d")
+    return {
+        "period": str(period),
+        "revenue": float(last_row.get("Revenue")) if "Revenue" in last_row else None,
+        "earnings": float(last_row.get("Earnings")) if "Earnings" in last_row else None,
+    }
+
+def _yf_quote(ticker: str, company_name: str) -> Dict[str, Any]:
+    info = _market_data("info", ticker, _yf_info)
+    price = _market_data("price", ticker, _yf_price) or {}
+    last_price = price.get("last_price")
+    prev_close = price.get("prev_close")
+    change_pct = None
+    if last_price is not None and prev_close:
+        try:
+            change_pct = ((last_price - prev_close) / prev_close) * 100
+        except Exception:
+            change_pct = None
+
+    return {
+        "currency": info.get("currency", "USD"),
+        "current_price": last_price,
+        "change_1d_pct": change_pct if change_pct is not None else 0,
+        "source": "yfinance",
+        "ticker": ticker,
+        "company_name": info.get("long_name") or company_name or ticker
+    }
+
+def _last_quarter(ticker: str) -> Dict[str, Any]:
+    try:
+        return _market_data("earnings", ticker, _yf_last_quarter)
     except Exception:
         return {}
 
+def _fetch_yfinance_data(ticker: str, company_name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    return _yf_quote(ticker, company_name), _last_quarter(ticker)
+
+# --- Prefetch hooks (used by agent.prefetch) ---
+
+_MARKET_FETCHERS = {"price": _yf_price, "info": _yf_info, "earnings": _yf_last_quarter}
+
+def _needs_refresh(cache: TieredCache, key: str, min_remaining: float) -> bool:
+    remaining = cache.ttl_remaining(key)
+    return remaining is None or remaining < min_remaining
+
+def _refresh_market_data(data_class: str, ticker: str) -> Any:
+    key = f"{data_class}:{ticker.upper()}"
+
+    def fetch():
+        value = guarded(f"yf_{data_class}", _MARKET_FETCHERS[data_class], ticker)
+        if value is not None:
+            _market_cache.set(key, value, MARKET_TTLS[data_class])
+        return value
+
+    # Same flight key as _market_data, so a concurrent /analyze shares the refresh.
+    return _flight.do((f"yf_{data_class}", ticker.upper()), fetch)
+
+async def prefetch_market_data(data_class: str, ticker: str, min_remaining: float) -> bool:
+    # Returns True when an upstream call was made.
+    # Off the loop: with a shared cache tier the check is a SQLite or Redis read.
+    if not await _run_blocking(_needs_refresh, _market_cache, f"{data_class}:{ticker.upper()}", min_remaining):
+        return False
+    await _run_blocking(_refresh_market_data, data_class, ticker)
+    return True
+
+async def prefetch_news(ticker: str, min_remaining: float) -> bool:
+    if await _run_blocking(news_store.is_fresh, ticker, min_remaining):
+        return False
+    await _run_blocking(_fetch_news, _news_query(ticker), ticker)
+    return True
+
+async def prefetch_history(ticker: str, min_remaining: float) -> bool:
+    if not price_history.needs_refresh(ticker, min_remaining):
+        return False
+    await _run_blocking(price_history.get, ticker)
+    return True
+
+def seed_prices(quotes: Dict[str, Dict[str, Any]]) -> int:
+    # A batched Yahoo quote carries the same last/previous close yfinance
+    # would return, so one request can warm the price entries of many tickers.
+    seeded = 0
+    for symbol, quote in quotes.items():
+        price, change = quote.get("current_price"), quote.get("change_1d_pct")
+        if price is None:
+            continue
+        prev_close = price / (1 + change / 100) if change is not None and change > -100 else None
+        _market_cache.set(f"price:{symbol.upper()}", {"last_price": float(price), "prev_close": prev_close}, MARKET_TTLS["price"])
+        seeded += 1
+    return seeded
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        "market_data": _market_cache.stats(),
+        "symbols": _symbol_cache.stats(),
+        "news": _news_cache.stats(),
+        "news_store": news_store.stats(),
+        "history": price_history.stats(),
+        "quotes": quote_stats(),
+        "single_flight": _flight.stats()
+    }
+
 def _normalize_evidence(results: Any) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
     if isinstance(results, list):
@@ -133,26 +356,17 @@ def _normalize_evidence(results: Any) -> List[Dict[str, Any]]:
                     source = urlparse(url).netloc.replace("www.", "")
                 except Exception:
                     source = ""
-            items.append(
-                {"id": i + 1, "title": title, "url": url, "snippet": snippet, "source": source}
-            )
+            ev = {"id": i + 1, "title": title, "url": url, "snippet": snippet, "source": item.get("source") or source}
+            published = published_at({"date": item.get("date"), "snippet": snippet})
+            ev["date"] = published.strftime("%Y-%m-%d") if published else ""
+            items.append(ev)
     else:
         items.append({"id": 1, "title": "Search results", "url": "", "snippet": str(results), "source": ""})
     return items
 
-def _evidence_bullets(evidence: List[Dict[str, Any]]) -> List[str]:
-    bullets = []
-    for ev in evidence:
-        title = ev.get("title", "News item")
-        snippet = ev.get("snippet", "")
-        url = ev.get("url", "")
-        if url:
-            bullets.append(f"{title}: {snippet} (source: {url})")
-        else:
-            bullets.append(f"{title}: {snippet}")
-    return bullets
-
 # --- Nodes ---
+# frame, web and yfinance run as parallel branches, so they return only the
+# keys they produce; LangGraph rejects concurrent writes to the same key.
 
 def intake_guard_node(state: AnalystState) -> AnalystState:
     profile = state.get("user_profile", {})
@@ -177,8 +391,39 @@ def supervisor_node(state: AnalystState) -> AnalystState:
         return state
 
     question = _get_last_user_text(state)
+    decision = classify_route(question)
+    if decision is not None:
+        return _apply_route(state, decision.label, decision.source, decision.confidence)
+
     reminder = state.get("reminder", "")
-    
+    try:
+        label = _groq(lambda: _supervisor_chain().invoke({"input": question, "reminder": reminder}))
+    except Exception:
+        label = "WEB" # Fallback
+    return _apply_route(state, label, "llm")
+
+async def asupervisor_node(state: AnalystState) -> AnalystState:
+    state.setdefault("retry_count", 0)
+    profile = state.get("user_profile", {})
+
+    if "budget" not in profile or "risk_level" not in profile:
+        state["route"] = "INTAKE"
+        state["plan"] = "Collect budget + risk."
+        return state
+
+    question = _get_last_user_text(state)
+    decision = classify_route(question)
+    if decision is not None:
+        return _apply_route(state, decision.label, decision.source, decision.confidence)
+
+    reminder = state.get("reminder", "")
+    try:
+        label = await _agroq(lambda: _supervisor_chain().ainvoke({"input": question, "reminder": reminder}))
+    except Exception:
+        label = "WEB" # Fallback
+    return _apply_route(state, label, "llm")
+
+def _supervisor_chain():
     template = """
     Classify query into ONE label: WEB, LLM, or DOC.
     Rules:
@@ -193,24 +438,66 @@ def supervisor_node(state: AnalystState) -> AnalystState:
     """
     
     prompt = PromptTemplate(template=template, input_variables=["input", "reminder"])
-    chain = prompt | model | StrOutputParser()
-    try:
-        label = chain.invoke({"input": question, "reminder": reminder}).strip().upper()
-    except Exception:
-        label = "WEB" # Fallback
+    return prompt | _llm() | StrOutputParser()
 
+def _apply_route(state: AnalystState, label: str, source: str, confidence: Optional[float] = None) -> AnalystState:
+    label = label.strip().upper()
     if label not in {"WEB", "LLM", "DOC"}:
         label = "WEB"
-        
+
     state["route"] = label
-    state["plan"] = f"Route to {label}"
+    state["route_source"] = source
+    state["route_confidence"] = confidence
+    state["plan"] = f"Route to {label} ({source})"
+    return state
+
+def _resolve_symbols(question: str) -> Dict[str, Any]:
+    ticker, company_name = _resolve_ticker_and_name(question)
+    tickers = _extract_tickers(question)
+    if len(tickers) < 2 or not _COMPARE_RE.search(question):
+        tickers = [ticker] if ticker else []
+    return {"ticker": ticker, "company_name": company_name, "tickers": tickers[:MAX_COMPARE]}
+
+def resolve_ticker_node(state: AnalystState) -> AnalystState:
+    # Resolve once per run; retries reuse the symbols already in state.
+    if "tickers" in state:
+        return state
+    state.update(_resolve_symbols(_get_last_user_text(state)))
     return state
 
+async def aresolve_symbols(question: str) -> Dict[str, Any]:
+    return await _run_blocking(_resolve_symbols, question)
+
+async def aresolve_ticker_node(state: AnalystState) -> AnalystState:
+    if "tickers" in state:
+        return state
+    state.update(await aresolve_symbols(_get_last_user_text(state)))
+    return state
+
+def _is_comparison(state: AnalystState) -> bool:
+    return len(state.get("tickers", [])) > 1
+
+def _target(state: AnalystState, question: str) -> str:
+    if _is_comparison(state):
+        return " vs ".join(state["tickers"])
+    return state.get("ticker", "") or state.get("company_name", "") or question
+
+def _frame_key(question: str, target: str) -> Tuple[str, str, str]:
+    return ("groq_frame", " ".join(question.lower().split()), target.upper())
+
 def llm_frame_node(state: AnalystState) -> AnalystState:
     question = _get_last_user_text(state)
-    ticker, company_name = _resolve_ticker_and_name(question)
-    target = ticker or company_name or question
-    
+    inputs = {"question": question, "target": _target(state, question)}
+    frame = _flight.do(_frame_key(**inputs), lambda: _groq(lambda: _frame_chain().invoke(inputs)))
+    return {"frame": frame}
+
+async def allm_frame_node(state: AnalystState) -> AnalystState:
+    question = _get_last_user_text(state)
+    inputs = {"question": question, "target": _target(state, question)}
+    frame = await _flight.ado(_frame_key(**inputs), lambda: _agroq(lambda: _frame_chain().ainvoke(inputs)))
+    return {"frame": frame}
+
+def _frame_chain():
     template = """
     Prepare analysis frame for: {question} (Target: {target})
     Return:
@@ -221,147 +508,276 @@ def llm_frame_node(state: AnalystState) -> AnalystState:
     """
     
     prompt = PromptTemplate(template=template, input_variables=["question", "target"])
-    frame = (prompt | model | StrOutputParser()).invoke({"question": question, "target": target})
-    state["frame"] = frame
-    return state
+    return prompt | _llm() | StrOutputParser()
 
-def web_crawler_node(state: AnalystState) -> AnalystState:
-    question = _get_last_user_text(state)
-    ticker, company_name = _resolve_ticker_and_name(question)
-    query_target = ticker or company_name or question
-    query = f"{query_target} latest news earnings guidance risks"
-    
+def _news_query(target: str) -> str:
+    return f"{target} latest news earnings guidance risks"
+
+def _search_error(e: Exception) -> List[Dict[str, Any]]:
+    return [{"id": 1, "title": "Search error", "url": "", "snippet": str(e), "source": ""}]
+
+def _query_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _fetch_news(query: str, ticker: str = "") -> Any:
+    key = _query_key(query)
+
+    def fetch():
+        results = _tracked("ddgs", clients.get("ddgs").results, query, max_results=NEWS_RESULTS)
+        if isinstance(results, list):
+            _news_cache.set(key, results)
+            if ticker:
+                news_store.add(ticker, _normalize_evidence(results))
+        return results
+
+    return _flight.do(("ddgs", key), fetch)
+
+def _stored_evidence(ticker: str) -> List[Dict[str, Any]]:
+    return [
+        {k: v for k, v in item.items() if k not in ("ticker", "fetched_at")}
+        for item in news_store.recent(ticker, NEWS_WINDOW)
+    ]
+
+def _search_news(target: str, max_results: int, company_name: str = "", ticker: str = "") -> List[Dict[str, Any]]:
+    # With a ticker, evidence is ranked from the stored rolling window of its
+    # news, and a recent search for it is reused instead of searching again.
     try:
-        results = wrapper.results(query, max_results=5)
-        state["web_evidence"] = _normalize_evidence(results)
+        if ticker and news_store.is_fresh(ticker):
+            news_store.mark_reused()
+            return prepare(_stored_evidence(ticker), target, company_name)[:max_results]
+        query = _news_query(target)
+        results = _news_cache.get(_query_key(query))
+        if results is None:
+            results = _fetch_news(query, ticker)
+        if not isinstance(results, list):
+            return _normalize_evidence(results)
+        items = (_stored_evidence(ticker) if ticker else []) or _normalize_evidence(results)
+        return prepare(items, target, company_name)[:max_results]
     except Exception as e:
-        state["web_evidence"] = [{"id": 1, "title": "Search error", "url": "", "snippet": str(e), "source": ""}]
-    return state
+        # Throttled or failed: older stored news beats an error item in the prompt.
+        stored = _stored_evidence(ticker) if ticker else []
+        if stored:
+            return prepare(stored, target, company_name)[:max_results]
+        return _search_error(e)
 
-def yfinance_node(state: AnalystState) -> AnalystState:
+def news_for(ticker: str, query: str = "", limit: int = NEWS_WINDOW) -> List[Dict[str, Any]]:
+    # Backs GET /news/{ticker}: refreshes a stale ticker, then reads the store.
+    ticker = ticker.strip().upper()
+    if not news_store.is_fresh(ticker):
+        _fetch_news(_news_query(ticker), ticker)
+    if query:
+        return news_store.search(query, ticker, limit)
+    return news_store.recent(ticker, limit)
+
+async def anews_for(ticker: str, query: str = "", limit: int = NEWS_WINDOW) -> List[Dict[str, Any]]:
+    return await _run_blocking(news_for, ticker, query, limit)
+
+def _merge_evidence(by_ticker: Dict[str, List[Dict[str, Any]]]) -> AnalystState:
+    # Round-robin so every ticker's best items lead, then drop stories shared across tickers.
+    merged = []
+    for position in range(max((len(items) for items in by_ticker.values()), default=0)):
+        for ticker, items in by_ticker.items():
+            if position < len(items):
+                merged.append({**items[position], "ticker": ticker})
+    merged = [{**item, "id": i + 1} for i, item in enumerate(dedupe(merged))]
+    return {"web_evidence": merged, "evidence_by_ticker": by_ticker}
+
+def web_crawler_node(state: AnalystState) -> AnalystState:
+    if _is_comparison(state):
+        tickers = state["tickers"]
+        results = _map_blocking(lambda t: _search_news(t, 3, ticker=t), tickers)
+        return _merge_evidence(dict(zip(tickers, results)))
     question = _get_last_user_text(state)
-    ticker, company_name = _resolve_ticker_and_name(question)
-    
-    if not ticker:
-        state["price_data"] = {"error": "Ticker not detected"}
-        return state
-        
+    return {"web_evidence": _search_news(
+        _target(state, question), 5, state.get("company_name", ""), state.get("ticker", "")
+    )}
+
+async def aweb_crawler_node(state: AnalystState) -> AnalystState:
+    if _is_comparison(state):
+        tickers = state["tickers"]
+        results = await asyncio.gather(*(_run_blocking(_search_news, t, 3, "", t) for t in tickers))
+        return _merge_evidence(dict(zip(tickers, results)))
+    question = _get_last_user_text(state)
+    return {"web_evidence": await _run_blocking(
+        _search_news, _target(state, question), 5, state.get("company_name", ""), state.get("ticker", "")
+    )}
+
+def _ticker_market_data(ticker: str, company_name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        fast = getattr(stock, "fast_info", {}) or {}
-        last_price = fast.get("last_price") or fast.get("lastPrice") or fast.get("regular_market_price")
-        prev_close = fast.get("previous_close") or fast.get("previousClose")
-        change_pct = None
-        if last_price is not None and prev_close:
-            try:
-                change_pct = ((last_price - prev_close) / prev_close) * 100
-            except Exception:
-                change_pct = None
-        if last_price is None:
-            try:
-                history = stock.history(period="5d")
-                if not history.empty and "Close" in history:
-                    closes = history["Close"].dropna()
-                    if len(closes) >= 2:
-                        last_price = float(closes.iloc[-1])
-                        prev_close = float(closes.iloc[-2])
-                        change_pct = ((last_price - prev_close) / prev_close) * 100
-            except Exception:
-                pass
-
-        last_quarter = {}
-        try:
-            qe = stock.quarterly_earnings
-            if hasattr(qe, "empty") and not qe.empty:
-                last_row = qe.iloc[-1]
-                period = qe.index[-1]
-                if hasattr(period, "to_pydatetime"):
-                    period = period.to_pydatetime().strftime("%Y-%m-%d")
-                last_quarter = {
-                    "period": str(period),
-                    "revenue": float(last_row.get("Revenue")) if "Revenue" in last_row else None,
-                    "earnings": float(last_row.get("Earnings")) if "Earnings" in last_row else None,
-                }
-        except Exception:
-            last_quarter = {}
-        
-        data = {
-            "currency": info.get("currency", "USD"),
-            "current_price": last_price or info.get("currentPrice") or info.get("regularMarketPrice"),
-            "change_1d_pct": change_pct if change_pct is not None else info.get("regularMarketChangePercent", 0),
-            "source": "yfinance",
-            "ticker": ticker,
-            "company_name": info.get("longName") or company_name or ticker
-        }
+        data, last_quarter = _fetch_yfinance_data(ticker, company_name)
         if data.get("current_price") is None:
             fallback = _fetch_quote_yahoo(ticker)
             if fallback:
                 data = fallback
-        state["price_data"] = data
-        state["last_quarter"] = last_quarter
+        return data, last_quarter
     except Exception as e:
         fallback = _fetch_quote_yahoo(ticker)
         if fallback:
-            state["price_data"] = fallback
-        else:
-            state["price_data"] = {"ticker": ticker, "error": str(e)}
-    return state
+            return fallback, {}
+        return {"ticker": ticker, "error": str(e)}, {}
+
+def _has_price(data: Dict[str, Any]) -> bool:
+    return bool(data) and data.get("current_price") is not None
+
+async def _aticker_market_data(ticker: str, company_name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # yfinance is the primary price source; the Yahoo quote is hedged against it
+    # once it is slow or comes back without a price, and the first price wins.
+    last_quarter = asyncio.ensure_future(_run_blocking(_last_quarter, ticker))
+    try:
+        data = await hedged(
+            lambda: _run_blocking(_yf_quote, ticker, company_name),
+            lambda: _afetch_quote_yahoo(ticker),
+            accept=_has_price
+        )
+        if not data:
+            data = {"ticker": ticker, "error": "No price from yfinance or Yahoo quote"}
+    except Exception as e:
+        data = {"ticker": ticker, "error": str(e)}
+    return data, await last_quarter
+
+def _market_update(
+    tickers: List[str], results: List[Tuple[Dict[str, Any], Dict[str, Any]]], metrics: Dict[str, Dict[str, Any]]
+) -> AnalystState:
+    # price_data / last_quarter keep describing the primary ticker.
+    return {
+        "price_data": results[0][0],
+        "last_quarter": results[0][1],
+        "price_data_by_ticker": {t: r[0] for t, r in zip(tickers, results)},
+        "last_quarter_by_ticker": {t: r[1] for t, r in zip(tickers, results)},
+        "price_metrics_by_ticker": metrics,
+    }
+
+def _horizon(state: AnalystState) -> str:
+    return state.get("user_profile", {}).get("horizon") or "6m"
+
+def yfinance_node(state: AnalystState) -> AnalystState:
+    tickers = state.get("tickers", [])
+    company_name = state.get("company_name", "")
+    
+    if not tickers:
+        return {"price_data": {"error": "Ticker not detected"}}
+
+    results = _map_blocking(
+        lambda t: _ticker_market_data(t, company_name if t == state.get("ticker") else ""), tickers
+    )
+    metrics = dict(zip(tickers, _map_blocking(lambda t: risk_metrics([t], _horizon(state))[t], tickers)))
+    return _market_update(tickers, results, metrics)
+
+async def ayfinance_node(state: AnalystState) -> AnalystState:
+    tickers = state.get("tickers", [])
+    company_name = state.get("company_name", "")
+
+    if not tickers:
+        return {"price_data": {"error": "Ticker not detected"}}
+
+    # History metrics come from the cached series, fetched alongside the quotes.
+    metrics = asyncio.gather(*(_run_blocking(risk_metrics, [t], _horizon(state)) for t in tickers))
+    results = await asyncio.gather(*(
+        _aticker_market_data(t, company_name if t == state.get("ticker") else "") for t in tickers
+    ))
+    merged_metrics: Dict[str, Dict[str, Any]] = {}
+    for m in await metrics:
+        merged_metrics.update(m)
+    return _market_update(tickers, list(results), merged_metrics)
+
+# risk -> (target annualized volatility, tolerated max drawdown)
+_RISK_TOLERANCE = {"low": (0.25, 0.15), "medium": (0.40, 0.25), "high": (0.60, 0.40)}
 
 def score_and_shortlist_node(state: AnalystState) -> AnalystState:
     profile = state.get("user_profile", {})
     risk = profile.get("risk_level", "medium")
-    price_data = state.get("price_data", {})
-    web_evidence = state.get("web_evidence", [])
-    
-    ticker = price_data.get("ticker", "UNKNOWN")
-    
-    score = 50
-    breakdown = [{"label": "Base", "value": 50}]
-    if "error" in price_data:
-        score -= 10
-        breakdown.append({"label": "Price data missing", "value": -10})
+    by_ticker = state.get("price_data_by_ticker") or {}
+    if by_ticker:
+        tickers = list(by_ticker)
+        prices = [by_ticker[t] for t in tickers]
     else:
-        score += 10
-        breakdown.append({"label": "Price data available", "value": 10})
-    news_count = len([e for e in web_evidence if e.get("url") or e.get("snippet")])
-    news_points = min(news_count * 3, 15)
-    if news_points:
-        score += news_points
-        breakdown.append({"label": "News coverage", "value": news_points})
-    change_pct = price_data.get("change_1d_pct")
-    if isinstance(change_pct, (int, float)):
-        move = max(min(change_pct, 5), -5)
-        if move:
-            score += move
-            breakdown.append({"label": "1D price move", "value": round(move, 2)})
-    if risk == "low":
-        score -= 5
-        breakdown.append({"label": "Low risk profile", "value": -5})
-    elif risk == "high":
-        score += 5
-        breakdown.append({"label": "High risk profile", "value": 5})
-    
-    item = {
-        "ticker": ticker,
-        "score": max(0, min(100, score)),
-        "pros": ["Recent news reviewed"],
-        "cons": ["Demo scoring model"],
-        "risks": ["Market volatility"],
-        "evidence_refs": ["web_evidence", "price_data"],
-        "score_breakdown": breakdown
-    }
-    state["shortlist"] = [item]
+        price_data = state.get("price_data", {})
+        tickers = [price_data.get("ticker", "UNKNOWN")]
+        prices = [price_data]
+    evidence_by_ticker = state.get("evidence_by_ticker")
+    evidence = [
+        evidence_by_ticker.get(t, []) if evidence_by_ticker else state.get("web_evidence", [])
+        for t in tickers
+    ]
+
+    # Score every candidate at once; a single ticker is just a batch of one.
+    has_price = np.array(["error" not in p for p in prices])
+    news_count = np.array([len([e for e in ev if e.get("url") or e.get("snippet")]) for ev in evidence])
+    change_pct = np.array([
+        p.get("change_1d_pct") if isinstance(p.get("change_1d_pct"), (int, float)) else np.nan
+        for p in prices
+    ], dtype=float)
+    price_points = np.where(has_price, 10, -10)
+    news_points = np.minimum(news_count * 3, 15)
+    moves = np.nan_to_num(np.clip(change_pct, -5, 5))
+    risk_points = {"low": -5, "high": 5}.get(risk, 0)
+
+    # History metrics over the profile horizon; missing metrics score 0.
+    horizon = _horizon(state)
+    metrics_by_ticker = state.get("price_metrics_by_ticker") or {}
+    metrics = [metrics_by_ticker.get(t) or {} for t in tickers]
+    vol, drawdown, momentum, beta = (
+        np.array([m.get(k) if isinstance(m.get(k), (int, float)) else np.nan for m in metrics], dtype=float)
+        for k in ("volatility", "max_drawdown", "momentum", "beta")
+    )
+    target_vol, max_drawdown = _RISK_TOLERANCE.get(risk, _RISK_TOLERANCE["medium"])
+    momentum_points = np.nan_to_num(np.clip(momentum * 25, -5, 5))
+    volatility_points = np.nan_to_num(-np.clip((vol - target_vol) * 20, 0, 6))
+    drawdown_points = np.nan_to_num(-np.clip((-drawdown - max_drawdown) * 20, 0, 5))
+    # Low-risk profiles prefer defensive (beta < 1) names, high-risk ones aggressive names.
+    beta_points = np.nan_to_num(np.clip((beta - 1) * 4, -3, 3)) * {"low": -1, "high": 1}.get(risk, 0)
+
+    scores = np.clip(
+        50 + price_points + news_points + moves + risk_points
+        + momentum_points + volatility_points + drawdown_points + beta_points,
+        0, 100
+    )
+
+    shortlist = []
+    for i in np.argsort(-scores, kind="stable"):
+        breakdown = [{"label": "Base", "value": 50}]
+        if has_price[i]:
+            breakdown.append({"label": "Price data available", "value": 10})
+        else:
+            breakdown.append({"label": "Price data missing", "value": -10})
+        if news_points[i]:
+            breakdown.append({"label": "News coverage", "value": int(news_points[i])})
+        if moves[i]:
+            breakdown.append({"label": "1D price move", "value": round(float(moves[i]), 2)})
+        if risk == "low":
+            breakdown.append({"label": "Low risk profile", "value": -5})
+        elif risk == "high":
+            breakdown.append({"label": "High risk profile", "value": 5})
+        for label, points in (
+            (f"{horizon} momentum", momentum_points), ("Volatility above risk target", volatility_points),
+            ("Drawdown beyond tolerance", drawdown_points), ("Market beta fit", beta_points),
+        ):
+            if points[i]:
+                breakdown.append({"label": label, "value": round(float(points[i]), 2)})
+        shortlist.append({
+            "ticker": tickers[i],
+            "company_name": prices[i].get("company_name", ""),
+            "score": round(float(scores[i]), 2),
+            "pros": ["Recent news reviewed"],
+            "cons": ["Demo scoring model"],
+            "risks": ["Market volatility"],
+            "evidence_refs": ["web_evidence", "price_data"],
+            "risk_metrics": {k: round(v, 4) if isinstance(v, float) else v for k, v in metrics[i].items()},
+            "score_breakdown": breakdown
+        })
+    state["shortlist"] = shortlist
     return state
 
 def draft_writer_node(state: AnalystState) -> AnalystState:
-    question = _get_last_user_text(state)
-    profile = state.get("user_profile", {})
-    ticker, company_name = _resolve_ticker_and_name(question)
-    target = ticker or company_name or question
-    evidence = state.get("web_evidence", [])
-    evidence_bullets = _evidence_bullets(evidence)
-    
+    output = _groq(lambda: _draft_chain().invoke(_draft_inputs(state)))
+    return _finalize_draft(state, _draft_fields(output))
+
+async def adraft_writer_node(state: AnalystState) -> AnalystState:
+    output = await _agroq(lambda: _draft_chain().ainvoke(_draft_inputs(state)))
+    return _finalize_draft(state, _draft_fields(output))
+
+def _draft_chain():
+    llm, output = _draft_llm()
     template = """
     You are a financial analyst. Use provided evidence.
     
@@ -371,83 +787,188 @@ def draft_writer_node(state: AnalystState) -> AnalystState:
     Evidence: {web}
     Price: {price}
     Shortlist: {shortlist}
-    
-    Write JSON with keys:
-    - executive_summary: string (no source links)
-    - expected_return: string (timeframe-specific)
-    - news_summary: list of descriptive strings
-    - bull_case: list of descriptive strings
-    - bear_case: list of descriptive strings
-    - key_risks: list of descriptive strings
-    - last_quarter_result: string
+    {comparison}{feedback}
+    {output}
     Requirements:
     - Executive summary must include: Recommendation (YES/NO), Expected growth strength (High/Medium/Low),
       and Risk points (comma-separated). No source links in executive_summary.
     - expected_return should be a % range for the selected horizon ({horizon}).
     - Include sources by appending "(source: URL)" when referencing any news outside the executive summary.
     - Keep items descriptive (1-2 sentences).
-    - Do not include markdown or extra keys.
+    - Do not include markdown.
     """
     
     prompt = PromptTemplate(
         template=template,
-        input_variables=["budget", "risk", "horizon", "question", "target", "web", "price", "shortlist"]
+        input_variables=["budget", "risk", "horizon", "question", "target", "web", "price", "shortlist", "comparison", "feedback"],
+        partial_variables={"output": output}
     )
-    draft_text = (prompt | model | StrOutputParser()).invoke({
+    return prompt | llm
+
+_DRAFT_JSON_OUTPUT = (
+    "Reply with only a JSON object with the keys " + ", ".join(DraftReport.model_fields)
+    + "; news_summary, bull_case, bear_case and key_risks are lists of strings."
+)
+
+# (model, runnable, output instruction): converting the schema to a tool costs
+# a few ms, so it is redone only when the registry's model is swapped.
+_draft_llm_cache: Tuple[Any, Any, str] = (None, None, "")
+
+def _draft_llm() -> Tuple[Any, str]:
+    global _draft_llm_cache
+    bound_to, runnable, output = _draft_llm_cache
+    model = clients.get("llm")
+    if bound_to is not model:
+        try:
+            # Tool-call structured output; include_raw keeps a malformed call salvageable.
+            runnable = model.with_structured_output(DraftReport, include_raw=True)
+            output = "Fill in the DraftReport."
+        except NotImplementedError:
+            # Models without tool calling are asked for plain JSON, which
+            # _draft_fields reads from the message content like a failed call.
+            runnable = model | RunnableLambda(lambda message: {"raw": message, "parsed": None})
+            output = _DRAFT_JSON_OUTPUT
+        runnable = runnable.with_config(callbacks=[llm_usage_handler])
+        _draft_llm_cache = (model, runnable, output)
+    return runnable, output
+
+def _draft_inputs(state: AnalystState) -> Dict[str, Any]:
+    question = _get_last_user_text(state)
+    profile = state.get("user_profile", {})
+    return {
         "budget": profile.get("budget"), 
         "risk": profile.get("risk_level"),
         "horizon": profile.get("horizon"),
         "question": question,
-        "target": target,
-        "web": evidence,
-        "price": state.get("price_data"),
-        "shortlist": state.get("shortlist")
-    })
-    draft = {
-        "executive_summary": "",
-        "expected_return": "",
-        "news_summary": [],
-        "bull_case": [],
-        "bear_case": [],
-        "key_risks": [],
-        "last_quarter_result": ""
+        "target": _target(state, question),
+        "web": prompt_evidence(state.get("web_evidence", [])),
+        "price": _prompt_price(state),
+        "shortlist": _prompt_shortlist(state),
+        "comparison": _comparison_instructions(state),
+        "feedback": _draft_feedback(state)
     }
+
+def _compact(data: Dict[str, Any]) -> str:
+    return json.dumps({k: v for k, v in data.items() if v not in (None, "", {}, [])}, separators=(",", ":"), default=str)
+
+def _prompt_price(state: AnalystState) -> str:
+    if _is_comparison(state):
+        return "; ".join(f"{t}: {_compact(p)}" for t, p in (state.get("price_data_by_ticker") or {}).items())
+    return _compact(state.get("price_data") or {})
+
+def _prompt_shortlist(state: AnalystState) -> str:
+    # The score and its risk inputs; the per-factor breakdown is for the UI.
+    return "; ".join(
+        f"{item.get('ticker')} score {item.get('score')} {_compact(item.get('risk_metrics') or {})}"
+        for item in state.get("shortlist", [])
+    )
+
+def _comparison_instructions(state: AnalystState) -> str:
+    if not _is_comparison(state):
+        return ""
+    ranked = ", ".join(item["ticker"] for item in state.get("shortlist", []))
+    return (
+        f"This is a comparison of {', '.join(state['tickers'])} (ranked by score: {ranked}). "
+        "Say which candidate best fits the profile in the executive summary, and name the ticker "
+        "at the start of every bull_case, bear_case and key_risks item.\n"
+    )
+
+def _draft_feedback(state: AnalystState) -> str:
+    if not state.get("retry_count"):
+        return ""
+    reasons = state.get("validation", {}).get("reasons", [])
+    return (
+        f"Your previous draft failed validation: {'; '.join(reasons)}. "
+        "Fix these issues; every listed section must be a non-empty list.\n"
+    )
+
+_DRAFT_LISTS = [name for name, f in DraftReport.model_fields.items() if f.annotation == List[str]]
+
+def _coerce_draft(data: Any) -> Dict[str, Any]:
+    # Keeps the schema's fields from a partial or loosely typed draft.
+    draft: Dict[str, Any] = {name: [] if name in _DRAFT_LISTS else "" for name in DraftReport.model_fields}
+    if not isinstance(data, dict):
+        return draft
+    for name in draft:
+        value = data.get(name)
+        if name in _DRAFT_LISTS:
+            if isinstance(value, str) and value.strip():
+                value = [value]
+            draft[name] = [str(v) for v in value if v] if isinstance(value, list) else []
+        elif value is not None:
+            draft[name] = "; ".join(map(str, value)) if isinstance(value, list) else str(value)
+    return draft
+
+def _partial_json(text: str) -> Any:
     try:
-        draft = json.loads(draft_text)
-    except Exception:
-        draft["news_summary"] = [draft_text]
-    if evidence_bullets:
-        draft.setdefault("bull_case", [])
-        draft.setdefault("bear_case", [])
-        draft.setdefault("key_risks", [])
-        draft.setdefault("news_summary", [])
-        for bullet in evidence_bullets:
-            draft["bull_case"].append(f"News impact: {bullet}")
-            draft["bear_case"].append(f"News impact: {bullet}")
-            draft["key_risks"].append(f"News risk: {bullet}")
-            if len(draft["news_summary"]) < 5:
-                draft["news_summary"].append(f"Summary: {bullet}")
-        if not draft["bull_case"]:
-            draft["bull_case"] = [f"News impact: {b}" for b in evidence_bullets]
-        if not draft["bear_case"]:
-            draft["bear_case"] = [f"News impact: {b}" for b in evidence_bullets]
-        if not draft["key_risks"]:
-            draft["key_risks"] = [f"News risk: {b}" for b in evidence_bullets]
-        if not draft["news_summary"]:
-            draft["news_summary"] = [f"Summary: {b}" for b in evidence_bullets]
+        return parse_partial_json(text)
+    except ValueError:
+        return None
+
+def _draft_fields(output: Dict[str, Any]) -> Dict[str, Any]:
+    parsed = output.get("parsed")
+    if isinstance(parsed, DraftReport):
+        return parsed.model_dump()
+    # The model returned a call that failed validation, truncated JSON, or
+    # plain text: keep whichever fields can be read instead of retrying.
+    raw = output.get("raw")
+    for call in getattr(raw, "tool_calls", None) or []:
+        return _coerce_draft(call.get("args"))
+    for call in getattr(raw, "invalid_tool_calls", None) or []:
+        return _coerce_draft(_partial_json(call.get("args") or ""))
+    content = getattr(raw, "content", "")
+    return _coerce_draft(_partial_json(content) if isinstance(content, str) else None)
+
+class DraftFieldStream:
+    """Turns streamed draft tool-call chunks into (field, value) pairs as each field completes."""
+
+    def __init__(self):
+        self.args = ""
+        self.sent: set = set()
+
+    def feed(self, message: Any) -> List[Tuple[str, Any]]:
+        chunks = getattr(message, "tool_call_chunks", None) or []
+        if chunks:
+            self.args += "".join(c.get("args") or "" for c in chunks)
+            complete = False
+        elif getattr(message, "tool_calls", None):
+            self.args = json.dumps(message.tool_calls[0].get("args") or {})
+            complete = True
+        else:
+            return []
+        partial = _partial_json(self.args)
+        if not isinstance(partial, dict):
+            return []
+        # A field is complete once the model has moved on to the next one.
+        names = list(partial) if complete else list(partial)[:-1]
+        return self._emit({name: partial[name] for name in names})
+
+    def flush(self, draft: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        return self._emit(draft)
+
+    def _emit(self, fields: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        out = [(name, value) for name, value in fields.items() if name in DraftReport.model_fields and name not in self.sent]
+        self.sent.update(name for name, _ in out)
+        return out
+
+def _finalize_draft(state: AnalystState, draft: Dict[str, Any]) -> AnalystState:
+    # Evidence only backfills the news summary. Empty bull/bear/risk sections
+    # are left for validation to send back to the draft writer.
+    evidence = state.get("web_evidence", [])
+    if evidence:
+        if not draft.get("news_summary"):
+            draft["news_summary"] = [f"Summary: {b}" for b in evidence_bullets(evidence)]
         if not draft.get("executive_summary"):
             draft["executive_summary"] = "Recommendation: NO; Expected growth strength: Medium; Risk points: news volatility, data gaps."
     last_quarter = state.get("last_quarter", {})
-    if last_quarter and not draft.get("last_quarter_result"):
-        period = last_quarter.get("period", "latest quarter")
-        revenue = last_quarter.get("revenue")
-        earnings = last_quarter.get("earnings")
-        summary_parts = [f"Period: {period}"]
-        if revenue is not None:
-            summary_parts.append(f"Revenue: {revenue}")
-        if earnings is not None:
-            summary_parts.append(f"Earnings: {earnings}")
-        draft["last_quarter_result"] = "; ".join(summary_parts)
+    if not draft.get("last_quarter_result"):
+        if _is_comparison(state):
+            draft["last_quarter_result"] = " | ".join(
+                f"{t}: {_quarter_summary(lq)}"
+                for t, lq in state.get("last_quarter_by_ticker", {}).items() if lq
+            )
+        elif last_quarter:
+            draft["last_quarter_result"] = _quarter_summary(last_quarter)
     if not draft.get("last_quarter_result"):
         draft["last_quarter_result"] = "No recent quarterly results data available."
     if not draft.get("expected_return"):
@@ -455,6 +976,17 @@ def draft_writer_node(state: AnalystState) -> AnalystState:
     state["draft"] = draft
     return state
 
+def _quarter_summary(last_quarter: Dict[str, Any]) -> str:
+    period = last_quarter.get("period", "latest quarter")
+    revenue = last_quarter.get("revenue")
+    earnings = last_quarter.get("earnings")
+    summary_parts = [f"Period: {period}"]
+    if revenue is not None:
+        summary_parts.append(f"Revenue: {revenue}")
+    if earnings is not None:
+        summary_parts.append(f"Earnings: {earnings}")
+    return "; ".join(summary_parts)
+
 def validation_node(state: AnalystState) -> AnalystState:
     draft = state.get("draft", "")
     reasons = []
@@ -0,0 +1,147 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+from .clients import clients
+from .metrics import Counter
+from .news_store import news_store
+from .quotes import MAX_BATCH, get_quotes
+from .universe import get_universe
+
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1") == "1"
+# Quotes are one batched request per MAX_BATCH symbols, so they refresh on the price TTL.
+QUOTE_INTERVAL = float(os.environ.get("PREFETCH_QUOTE_INTERVAL", os.environ.get("PRICE_CACHE_TTL", "15")))
+# Earnings, company info, news and price history are checked this often and refreshed only
+# when their cache entry would expire before the next pass.
+SLOW_INTERVAL = float(os.environ.get("PREFETCH_INTERVAL", "300"))
+# Upstream calls per second for the slow pass; cache hits are free.
+RATE = float(os.environ.get("PREFETCH_RATE", "0.5"))
+POPULAR_COUNT = int(os.environ.get("PREFETCH_POPULAR", "20"))
+POPULAR_HALF_LIFE = float(os.environ.get("PREFETCH_POPULAR_HALF_LIFE", "3600"))
+
+PREFETCHES = Counter("finsight_prefetch_total", "Background prefetch attempts by data kind and outcome.", ["kind", "outcome"])
+
+
+class PopularTickers:
+    """Exponentially decayed request counts per ticker."""
+
+    def __init__(self, half_life: float = POPULAR_HALF_LIFE):
+        self.half_life = half_life
+        self._scores: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * math.pow(0.5, (now - at) / self.half_life)
+
+    def record(self, tickers: Iterable[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for ticker in tickers:
+                ticker = ticker.strip().upper()
+                if not ticker:
+                    continue
+                score, at = self._scores.get(ticker, (0.0, now))
+                self._scores[ticker] = [self._decayed(score, at, now) + 1.0, now]
+
+    def top(self, n: int = POPULAR_COUNT) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            scored = {t: self._decayed(s, at, now) for t, (s, at) in self._scores.items()}
+            # Forget tickers nobody has asked about for a long while.
+            for t in [t for t, s in scored.items() if s < 0.05]:
+                del self._scores[t]
+        return sorted((t for t in scored if scored[t] >= 0.05), key=scored.get, reverse=True)[:n]
+
+
+popular = PopularTickers()
+
+
+def record_interest(tickers: Iterable[str]) -> None:
+    popular.record(tickers)
+
+
+class PrefetchScheduler:
+    def __init__(self, quote_interval: float = QUOTE_INTERVAL, slow_interval: float = SLOW_INTERVAL, rate: float = RATE):
+        self.quote_interval = quote_interval
+        self.slow_interval = slow_interval
+        self.rate = rate
+        self.passes = {"quotes": 0, "slow": 0}
+        self.last_error = ""
+        self._tasks: List[asyncio.Task] = []
+
+    def tickers(self) -> List[str]:
+        # Popular tickers first: they are the likeliest next /analyze.
+        universe = [item["ticker"].upper() for item in get_universe().items]
+        return list(dict.fromkeys(popular.top() + universe))
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.ensure_future(self._loop(self.refresh_quotes, self.quote_interval)),
+                asyncio.ensure_future(self._loop(self.refresh_slow, self.slow_interval)),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job, interval: float) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{job.__name__}: {e}"
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def refresh_quotes(self) -> None:
+        # The data nodes import yfinance and pandas; loaded off the event loop on the first pass.
+        nodes = await clients.aget("nodes")
+        tickers = self.tickers()
+        for i in range(0, len(tickers), MAX_BATCH):
+            quotes = await get_quotes(tickers[i:i + MAX_BATCH])
+            # Writes through to the shared cache tier, so it runs off the loop.
+            seeded = await asyncio.to_thread(nodes.seed_prices, {t: q for t, q in quotes.items() if q})
+            PREFETCHES.inc(seeded, kind="quotes", outcome="refreshed")
+        self.passes["quotes"] += 1
+
+    async def refresh_slow(self) -> None:
+        nodes = await clients.aget("nodes")
+        jobs = []
+        for ticker in self.tickers():
+            jobs.append(("earnings", lambda t=ticker: nodes.prefetch_market_data("earnings", t, self.slow_interval)))
+            jobs.append(("info", lambda t=ticker: nodes.prefetch_market_data("info", t, self.slow_interval)))
+            jobs.append(("news", lambda t=ticker: nodes.prefetch_news(t, self.slow_interval)))
+            jobs.append(("history", lambda t=ticker: nodes.prefetch_history(t, self.slow_interval)))
+        for kind, job in jobs:
+            try:
+                called = await job()
+            except Exception as e:
+                # Open circuits and timeouts land here; the next pass retries.
+                PREFETCHES.inc(kind=kind, outcome="error")
+                self.last_error = f"{kind}: {e}"
+                called = True
+            else:
+                PREFETCHES.inc(kind=kind, outcome="refreshed" if called else "fresh")
+            if called and self.rate > 0:
+                await asyncio.sleep(1.0 / self.rate)
+        news_store.purge()
+        self.passes["slow"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._tasks),
+            "passes": dict(self.passes),
+            "popular": popular.top(10),
+            "last_error": self.last_error
+        }
+
+
+prefetcher = PrefetchScheduler()
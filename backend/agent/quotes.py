@@ -0,0 +1,164 @@
+import asyncio
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import http_pool
+from . import shared_cache
+from .metrics import track_call
+from .resilience import aguarded
+
+YAHOO_QUOTE_URL = os.environ.get("YAHOO_QUOTE_URL", "https://query1.finance.yahoo.com/v7/finance/quote")
+
+# Coalescing window: single-ticker requests arriving within it share one HTTP call.
+BATCH_WINDOW = float(os.environ.get("QUOTE_BATCH_WINDOW", "0.02"))
+MAX_BATCH = int(os.environ.get("QUOTE_MAX_BATCH", "50"))
+
+_quote_cache = shared_cache.tiered(
+    "quotes", int(os.environ.get("QUOTE_CACHE_SIZE", "4096")), float(os.environ.get("PRICE_CACHE_TTL", "15"))
+)
+
+
+def _normalize(symbols: Iterable[str]) -> List[str]:
+    seen = []
+    for s in symbols:
+        s = s.strip().upper()
+        if s and s not in seen:
+            seen.append(s)
+    return seen
+
+
+def parse_quote(q: Dict[str, Any], ticker: str = "") -> Dict[str, Any]:
+    price = q.get("regularMarketPrice")
+    prev_close = q.get("regularMarketPreviousClose")
+    change_pct = None
+    if price is not None and prev_close:
+        try:
+            change_pct = ((price - prev_close) / prev_close) * 100
+        except Exception:
+            change_pct = None
+    ticker = q.get("symbol", ticker)
+    return {
+        "currency": q.get("currency", "USD"),
+        "current_price": price,
+        "change_1d_pct": change_pct,
+        "source": "yahoo_finance",
+        "ticker": ticker,
+        "company_name": q.get("longName") or q.get("shortName") or ticker
+    }
+
+
+def parse_quote_response(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    results = data.get("quoteResponse", {}).get("result", []) or []
+    return {str(q.get("symbol", "")).upper(): parse_quote(q) for q in results if q.get("symbol")}
+
+
+def fetch_quotes(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    symbols = _normalize(symbols)
+    if not symbols:
+        return {}
+    with track_call("yahoo_quote"):
+        # Both paths share the pooled "yahoo" connections instead of a handshake per call.
+        resp = http_pool.client("yahoo").get(YAHOO_QUOTE_URL, params={"symbols": ",".join(symbols)})
+        resp.raise_for_status()
+    return parse_quote_response(resp.json())
+
+
+async def afetch_quotes(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    symbols = _normalize(symbols)
+    if not symbols:
+        return {}
+    with track_call("yahoo_quote"):
+        resp = await http_pool.async_client("yahoo").get(YAHOO_QUOTE_URL, params={"symbols": ",".join(symbols)})
+        resp.raise_for_status()
+    return parse_quote_response(resp.json())
+
+
+class QuoteBatcher:
+    """Coalesces concurrent single-symbol lookups into multi-symbol requests."""
+
+    def __init__(self, window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.symbols_requested = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def get(self, symbol: str) -> Dict[str, Any]:
+        symbol = symbol.strip().upper()
+        fut = self._pending.get(symbol)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._pending[symbol] = fut
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        # Shield so one cancelled caller does not cancel the shared result.
+        return await asyncio.shield(fut)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, asyncio.Future]) -> None:
+        self.batches += 1
+        self.symbols_requested += len(batch)
+        try:
+            # Shared by many requests, so only the source deadline applies, not one caller's budget.
+            quotes = await aguarded("yahoo_quote", lambda: afetch_quotes(batch.keys()), use_budget=False)
+        except Exception:
+            quotes = {}
+        for symbol, fut in batch.items():
+            if not fut.done():
+                fut.set_result(quotes.get(symbol, {}))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"batches": self.batches, "symbols_requested": self.symbols_requested, "pending": len(self._pending)}
+
+
+_batchers: Dict[asyncio.AbstractEventLoop, QuoteBatcher] = {}
+
+
+def get_batcher() -> QuoteBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        for stale in [l for l in _batchers if l.is_closed()]:
+            del _batchers[stale]
+        batcher = _batchers[loop] = QuoteBatcher()
+    return batcher
+
+
+async def get_quote(symbol: str) -> Dict[str, Any]:
+    symbol = symbol.strip().upper()
+    cached = await _quote_cache.aget(symbol)
+    if cached is not None:
+        return cached
+    quote = await get_batcher().get(symbol)
+    if quote:
+        await _quote_cache.aset(symbol, quote)
+    return quote
+
+
+async def get_quotes(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    symbols = _normalize(symbols)
+    results = await asyncio.gather(*(get_quote(s) for s in symbols))
+    return dict(zip(symbols, results))
+
+
+def quote_stats() -> Dict[str, Any]:
+    batchers = [b.stats() for b in _batchers.values()]
+    return {
+        "cache": _quote_cache.stats(),
+        "batches": sum(b["batches"] for b in batchers),
+        "symbols_requested": sum(b["symbols_requested"] for b in batchers)
+    }
@@ -0,0 +1,197 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import Counter, Gauge, Histogram
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+# Shared by every worker process on the host; ":memory:" keeps the buckets per process.
+RATE_LIMIT_DB = os.environ.get("RATE_LIMIT_DB", "rate_limits.db")
+# Sustained calls per second and burst size per upstream; a rate of 0 disables limiting.
+_DEFAULT_RATES = {"yahoo": (5.0, 10), "ddgs": (1.0, 3), "groq": (0.0, 1)}
+RATES = {
+    name: (float(os.environ.get(f"RATE_{name.upper()}", rate)), int(os.environ.get(f"RATE_BURST_{name.upper()}", burst)))
+    for name, (rate, burst) in _DEFAULT_RATES.items()
+}
+# On a throttle the rate is multiplied by RATE_BACKOFF (down to RATE_MIN_FRACTION of the
+# configured rate) and new calls pause for Retry-After or RATE_COOLDOWN seconds. Each
+# success then adds back RATE_RECOVERY of the configured rate.
+RATE_BACKOFF = float(os.environ.get("RATE_BACKOFF", "0.5"))
+RATE_MIN_FRACTION = float(os.environ.get("RATE_MIN_FRACTION", "0.1"))
+RATE_RECOVERY = float(os.environ.get("RATE_RECOVERY", "0.05"))
+RATE_COOLDOWN = float(os.environ.get("RATE_COOLDOWN", "2"))
+# Retries of a throttled call, each after queueing for a new slot at the reduced rate.
+RATE_RETRIES = int(os.environ.get("RATE_RETRIES", "1"))
+
+RATE_WAIT_SECONDS = Histogram(
+    "finsight_rate_limit_wait_seconds", "Time calls queued for an upstream rate-limit slot.", ["upstream"],
+    buckets=(0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+RATE_LIMITED = Counter(
+    "finsight_rate_limit_total", "Rate-limited calls by upstream and outcome (immediate, queued, rejected, throttled).",
+    ["upstream", "outcome"]
+)
+
+_THROTTLE_RE = re.compile(r"\b429\b|too many requests|rate ?limit", re.I)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    upstream TEXT PRIMARY KEY,
+    tat REAL NOT NULL,
+    rate REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    throttles INTEGER NOT NULL
+);
+"""
+
+
+class RateLimitedError(RuntimeError):
+    pass
+
+
+def throttle_of(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """Whether an upstream error is a throttle (HTTP 429 or a library's rate-limit error), and its Retry-After."""
+    if isinstance(error, RateLimitedError):
+        # Our own queue limit, not the upstream's.
+        return False, None
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status == 429 or "ratelimit" in type(error).__name__.lower() or _THROTTLE_RE.search(str(error)):
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return True, float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return True, None
+    return False, None
+
+
+class RateLimiter:
+    """Token buckets per upstream, kept in SQLite so every worker draws from the same budget.
+
+    Buckets use virtual scheduling (GCRA): each call atomically reserves the next free
+    slot and sleeps until it, so callers are served in arrival order without polling.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_DB, rates: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.path = path
+        self.rates = {name: rb for name, rb in (rates or RATES).items() if rb[0] > 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._local = {name: {"queued": 0, "calls": 0, "waited": 0.0, "max_wait": 0.0, "rejected": 0} for name in self.rates}
+
+    def limited(self, upstream: str) -> bool:
+        return RATE_LIMIT_ENABLED and upstream in self.rates
+
+    def _row(self, upstream: str, now: float) -> Tuple[float, float, float]:
+        row = self._conn.execute("SELECT tat, rate, blocked_until FROM buckets WHERE upstream = ?", (upstream,)).fetchone()
+        if row is None:
+            row = (now, self.rates[upstream][0], 0.0)
+            self._conn.execute(
+                "INSERT INTO buckets (upstream, tat, rate, blocked_until, throttles) VALUES (?, ?, ?, ?, 0)",
+                (upstream, *row)
+            )
+        return row
+
+    def reserve(self, upstream: str, max_wait: float) -> Tuple[float, bool]:
+        """Reserves the next slot; returns (seconds to wait, whether the rate is below its configured value)."""
+        base, burst = self.rates[upstream]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                tat, rate, blocked_until = self._row(upstream, now)
+                rate = min(rate, base)
+                interval = 1.0 / rate
+                start = max(now, blocked_until)
+                tat = max(tat, start)
+                at = max(start, tat - (burst - 1) * interval)
+                wait = at - now
+                if wait > max_wait:
+                    self._conn.execute("ROLLBACK")
+                    self._local[upstream]["rejected"] += 1
+                    RATE_LIMITED.inc(upstream=upstream, outcome="rejected")
+                    raise RateLimitedError(f"{upstream} rate limited: next slot in {wait:.1f}s exceeds {max_wait:.1f}s")
+                self._conn.execute("UPDATE buckets SET tat = ? WHERE upstream = ?", (tat + interval, upstream))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        RATE_LIMITED.inc(upstream=upstream, outcome="queued" if wait > 0 else "immediate")
+        return max(wait, 0.0), rate < base
+
+    def waiting(self, upstream: str, delta: int) -> None:
+        with self._lock:
+            self._local[upstream]["queued"] += delta
+
+    def waited(self, upstream: str, seconds: float) -> None:
+        RATE_WAIT_SECONDS.observe(seconds, upstream=upstream)
+        with self._lock:
+            local = self._local[upstream]
+            local["calls"] += 1
+            local["waited"] += seconds
+            local["max_wait"] = max(local["max_wait"], seconds)
+
+    def _update(self, upstream: str, sql: str, args: Tuple[Any, ...]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._row(upstream, time.time())
+                self._conn.execute(sql, args)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def throttled(self, upstream: str, retry_after: Optional[float] = None) -> None:
+        # Multiplicative decrease, shared with every worker, plus a pause for new calls.
+        base, _ = self.rates[upstream]
+        until = time.time() + (retry_after if retry_after is not None else RATE_COOLDOWN)
+        self._update(
+            upstream,
+            "UPDATE buckets SET rate = MAX(rate * ?, ?), blocked_until = MAX(blocked_until, ?), "
+            "tat = MAX(tat, ?), throttles = throttles + 1 WHERE upstream = ?",
+            (RATE_BACKOFF, base * RATE_MIN_FRACTION, until, until, upstream)
+        )
+        RATE_LIMITED.inc(upstream=upstream, outcome="throttled")
+
+    def recovered(self, upstream: str) -> None:
+        # Additive increase back toward the configured rate.
+        base, _ = self.rates[upstream]
+        self._update(upstream, "UPDATE buckets SET rate = MIN(rate + ?, ?) WHERE upstream = ?", (base * RATE_RECOVERY, base, upstream))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = {r[0]: r[1:] for r in self._conn.execute("SELECT upstream, rate, blocked_until, throttles FROM buckets")}
+            local = {name: dict(values) for name, values in self._local.items()}
+        now = time.time()
+        out: Dict[str, Any] = {"enabled": RATE_LIMIT_ENABLED, "path": self.path}
+        for name, (base, burst) in self.rates.items():
+            rate, blocked_until, throttles = rows.get(name, (base, 0.0, 0))
+            calls = local[name].pop("calls")
+            waited = local[name].pop("waited")
+            out[name] = {
+                "configured_rate": base, "rate": round(rate, 3), "burst": burst, "throttles": throttles,
+                "blocked_for": round(max(blocked_until - now, 0.0), 3), "calls": calls,
+                "avg_wait": round(waited / calls, 4) if calls else 0.0,
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in local[name].items()}
+            }
+        return out
+
+
+rate_limiter = RateLimiter()
+
+RATE_CURRENT = Gauge(
+    "finsight_rate_limit_rate", "Current adaptive calls-per-second allowance by upstream.", ["upstream"],
+    lambda: {(name,): s["rate"] for name, s in rate_limiter.stats().items() if isinstance(s, dict)}
+)
@@ -0,0 +1,389 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from .metrics import Gauge
+from .rate_limit import RATE_RETRIES, rate_limiter, throttle_of
+
+# Per-source deadlines in seconds; override with DEADLINE_<SOURCE>, e.g. DEADLINE_DDGS=3.
+_DEFAULT_DEADLINES = {
+    "ddgs": 5.0,
+    "yf_search": 3.0,
+    "yf_info": 4.0,
+    "yf_price": 3.0,
+    "yf_earnings": 4.0,
+    "yf_history": 6.0,
+    "yahoo_quote": 3.0,
+}
+DEADLINES = {
+    source: float(os.environ.get(f"DEADLINE_{source.upper()}", default))
+    for source, default in _DEFAULT_DEADLINES.items()
+}
+
+# Upper bound on the data-gathering part of one /analyze request.
+LATENCY_BUDGET = float(os.environ.get("ANALYZE_LATENCY_BUDGET", "10"))
+# How long the primary price source gets before the backup is raced against it.
+HEDGE_DELAY = float(os.environ.get("HEDGE_DELAY", "0.5"))
+
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.environ.get("BREAKER_RESET", "30"))
+
+# Blocking upstream calls run here so a deadline can abandon them. A call that
+# overruns keeps its thread until the library returns, hence the separate pool.
+_upstream_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("UPSTREAM_WORKERS", "32")),
+    thread_name_prefix="finsight-upstream"
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets one probe through every reset period."""
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET):
+        self.name = name
+        self.max_failures = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        # The call was abandoned by its caller; neither outcome is known.
+        with self._lock:
+            self._probing = False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open; failing fast")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(source: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source)
+        return _breakers[source]
+
+
+# --- Request budget ---
+
+_budget_deadline: ContextVar[Optional[float]] = ContextVar("finsight_budget_deadline", default=None)
+
+
+def start_budget(seconds: Optional[float] = None) -> None:
+    _budget_deadline.set(time.monotonic() + (LATENCY_BUDGET if seconds is None else seconds))
+
+
+def time_left(source: str, use_budget: bool = True) -> float:
+    timeout = DEADLINES.get(source, 5.0)
+    deadline = _budget_deadline.get() if use_budget else None
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise TimeoutError(f"latency budget exhausted before {source}")
+    return timeout
+
+
+# --- Upstream concurrency limits ---
+
+def upstream_of(source: str) -> str:
+    # Call sources grouped by the service they hit.
+    if source.startswith("yf_") or source == "yahoo_quote":
+        return "yahoo"
+    return source
+
+
+class UpstreamLimits:
+    """Caps concurrent calls per upstream for whoever runs inside `use_limits`."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._sems = {name: threading.BoundedSemaphore(n) for name, n in limits.items() if n > 0}
+        self.waited = {name: 0.0 for name in self._sems}
+
+    @contextmanager
+    def slot(self, source: str) -> Iterator[None]:
+        sem = self._sems.get(upstream_of(source))
+        if sem is None:
+            yield
+            return
+        started = time.monotonic()
+        sem.acquire()
+        self.waited[upstream_of(source)] += time.monotonic() - started
+        try:
+            yield
+        finally:
+            sem.release()
+
+    @asynccontextmanager
+    async def aslot(self, source: str) -> AsyncIterator[None]:
+        sem = self._sems.get(upstream_of(source))
+        if sem is None:
+            yield
+            return
+        if not sem.acquire(blocking=False):
+            # Shared with worker threads, so the wait happens off the event loop.
+            started = time.monotonic()
+            acquiring = asyncio.get_running_loop().run_in_executor(None, sem.acquire)
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                acquiring.add_done_callback(lambda _: sem.release())
+                raise
+            self.waited[upstream_of(source)] += time.monotonic() - started
+        try:
+            yield
+        finally:
+            sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limits": self.limits, "waited_seconds": {k: round(v, 3) for k, v in self.waited.items()}}
+
+
+_upstream_limits: ContextVar[Optional[UpstreamLimits]] = ContextVar("finsight_upstream_limits", default=None)
+
+
+def use_limits(limits: Optional[UpstreamLimits]) -> None:
+    _upstream_limits.set(limits)
+
+
+_blocking_executor: ContextVar[Optional[Executor]] = ContextVar("finsight_blocking_executor", default=None)
+
+
+def use_executor(executor: Optional[Executor]) -> None:
+    # Limited callers park threads on their upstream slots; giving them their own
+    # pool keeps those threads out of the one interactive requests run on.
+    _blocking_executor.set(executor)
+
+
+def blocking_executor(default: Executor) -> Executor:
+    return _blocking_executor.get() or default
+
+
+@contextmanager
+def upstream_slot(source: str) -> Iterator[None]:
+    limits = _upstream_limits.get()
+    if limits is None:
+        yield
+        return
+    with limits.slot(source):
+        yield
+
+
+@asynccontextmanager
+async def aupstream_slot(source: str) -> AsyncIterator[None]:
+    limits = _upstream_limits.get()
+    if limits is None:
+        yield
+        return
+    async with limits.aslot(source):
+        yield
+
+
+# --- Rate limits ---
+
+def rate_limited(source: str, call: Callable[[], Any], use_budget: bool = True) -> Any:
+    """Runs `call` in its turn under the upstream's shared rate limit, retrying once after a throttle."""
+    upstream = upstream_of(source)
+    if not rate_limiter.limited(upstream):
+        return call()
+    for attempt in range(RATE_RETRIES + 1):
+        wait, recovering = rate_limiter.reserve(upstream, time_left(source, use_budget))
+        if wait:
+            rate_limiter.waiting(upstream, 1)
+            try:
+                time.sleep(wait)
+            finally:
+                rate_limiter.waiting(upstream, -1)
+        rate_limiter.waited(upstream, wait)
+        try:
+            result = call()
+        except Exception as e:
+            throttled, retry_after = throttle_of(e)
+            if not throttled:
+                raise
+            rate_limiter.throttled(upstream, retry_after)
+            if attempt == RATE_RETRIES:
+                raise
+            continue
+        if recovering:
+            rate_limiter.recovered(upstream)
+        return result
+
+
+async def arate_limited(source: str, call: Callable[[], Awaitable[Any]], use_budget: bool = True) -> Any:
+    upstream = upstream_of(source)
+    if not rate_limiter.limited(upstream):
+        return await call()
+    for attempt in range(RATE_RETRIES + 1):
+        # The limiter's SQLite transactions can wait on other workers' locks, so
+        # they run off the event loop.
+        wait, recovering = await asyncio.to_thread(rate_limiter.reserve, upstream, time_left(source, use_budget))
+        if wait:
+            rate_limiter.waiting(upstream, 1)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                rate_limiter.waiting(upstream, -1)
+        rate_limiter.waited(upstream, wait)
+        try:
+            result = await call()
+        except Exception as e:
+            throttled, retry_after = throttle_of(e)
+            if not throttled:
+                raise
+            await asyncio.to_thread(rate_limiter.throttled, upstream, retry_after)
+            if attempt == RATE_RETRIES:
+                raise
+            continue
+        if recovering:
+            await asyncio.to_thread(rate_limiter.recovered, upstream)
+        return result
+
+
+# --- Guarded calls ---
+
+def guarded(source: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with upstream_slot(source):
+        return rate_limited(source, lambda: _guarded(source, fn, *args, **kwargs))
+
+
+def _record_error(cb: CircuitBreaker, error: Exception) -> None:
+    # A throttle means the upstream is up but wants fewer calls; the rate limiter
+    # slows down instead of the breaker failing everything fast.
+    if throttle_of(error)[0]:
+        cb.release()
+    else:
+        cb.record_failure()
+
+
+def _guarded(source: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Blocking call with a deadline and circuit breaker; safe from any thread.
+    timeout = time_left(source)
+    cb = breaker(source)
+    cb.check()
+    ctx = contextvars.copy_context()
+    future = _upstream_executor.submit(ctx.run, fn, *args, **kwargs)
+    try:
+        result = future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        cb.record_failure()
+        raise TimeoutError(f"{source} exceeded its {timeout:.1f}s deadline")
+    except Exception as e:
+        _record_error(cb, e)
+        raise
+    cb.record_success()
+    return result
+
+
+async def aguarded(source: str, call: Callable[[], Awaitable[Any]], use_budget: bool = True) -> Any:
+    async with aupstream_slot(source):
+        return await arate_limited(source, lambda: _aguarded(source, call, use_budget), use_budget)
+
+
+async def _aguarded(source: str, call: Callable[[], Awaitable[Any]], use_budget: bool) -> Any:
+    timeout = time_left(source, use_budget)
+    cb = breaker(source)
+    cb.check()
+    try:
+        result = await asyncio.wait_for(call(), timeout)
+    except asyncio.TimeoutError:
+        cb.record_failure()
+        raise TimeoutError(f"{source} exceeded its {timeout:.1f}s deadline")
+    except asyncio.CancelledError:
+        # Cancelled by the caller (e.g. a losing hedge), not an upstream failure.
+        cb.release()
+        raise
+    except Exception as e:
+        _record_error(cb, e)
+        raise
+    cb.record_success()
+    return result
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[Any]],
+    backup: Callable[[], Awaitable[Any]],
+    accept: Callable[[Any], bool],
+    delay: float = HEDGE_DELAY,
+) -> Any:
+    """Returns the first accepted result; the backup starts once the primary is slow or has failed."""
+    tasks = [asyncio.ensure_future(primary())]
+    done, _ = await asyncio.wait(tasks, timeout=delay)
+    if done and not tasks[0].exception() and accept(tasks[0].result()):
+        return tasks[0].result()
+    tasks.append(asyncio.ensure_future(backup()))
+    pending = set(t for t in tasks if not t.done())
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.exception() and accept(task.result()):
+                    return task.result()
+        # Nothing acceptable: prefer any plain result, else re-raise the primary's error.
+        for task in tasks:
+            if not task.exception():
+                return task.result()
+        raise tasks[0].exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def resilience_stats() -> Dict[str, Any]:
+    with _breakers_lock:
+        return {source: cb.stats() for source, cb in _breakers.items()}
+
+
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+CIRCUIT_STATE = Gauge(
+    "finsight_circuit_state", "Circuit breaker state by source (0 closed, 1 half-open, 2 open).", ["source"],
+    lambda: {(s,): _STATE_VALUES[v["state"]] for s, v in resilience_stats().items()}
+)
@@ -0,0 +1,125 @@
+import copy
+import os
+import re
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from . import shared_cache
+
+# Cached /analyze payloads live briefly while the market is open and until
+# (at most) the next open when it is closed.
+TTL_MARKET_OPEN = float(os.environ.get("RESPONSE_CACHE_TTL_OPEN", "300"))
+TTL_MARKET_CLOSED = float(os.environ.get("RESPONSE_CACHE_TTL_CLOSED", "3600"))
+
+_MARKET_TZ = ZoneInfo("America/New_York")
+_OPEN, _CLOSE = dtime(9, 30), dtime(16, 0)
+
+# Ordered: the first matching intent wins.
+_INTENTS = [
+    ("compare", re.compile(r"\b(vs\.?|versus|compare|compared|better than)\b")),
+    ("earnings", re.compile(r"\b(earnings|revenue|quarter(ly)?|eps|guidance|results)\b")),
+    ("dividend", re.compile(r"\b(dividends?|yield|payout)\b")),
+    ("valuation", re.compile(r"\b(valuation|overvalued|undervalued|p/?e|cheap|expensive|fair value)\b")),
+    ("risk", re.compile(r"\b(risk|risky|safe|volatil\w*|downside)\b")),
+    ("news", re.compile(r"\b(news|why (is|did|does)|what happened|up today|down today)\b")),
+    ("outlook", re.compile(r"\b(outlook|forecast|future|prospects?|target|long term|growth)\b")),
+    # A "Recommendation: YES" to a buy question reverses meaning for a sell or hold one.
+    ("sell_decision", re.compile(r"\b(sell|selling|dump|exit|take profits?|get out)\b")),
+    ("hold_decision", re.compile(r"\b(hold|holding|keep)\b")),
+    ("buy_decision", re.compile(r"\b(buy|invest(ing)?|worth|good (stock|investment|pick)|a buy)\b")),
+]
+_STOP = {"i", "a", "an", "the", "is", "it", "in", "on", "of", "for", "to", "should", "now", "stock",
+         "shares", "do", "you", "think", "my", "me", "this", "that", "what", "about", "right"}
+
+_BUDGET_BUCKETS = [(1_000, "<1k"), (5_000, "1k-5k"), (25_000, "5k-25k"), (100_000, "25k-100k")]
+
+
+def question_intent(question: str, ticker: str = "", company_name: str = "") -> str:
+    text = question.lower()
+    for name in (ticker, company_name):
+        if name:
+            text = text.replace(name.lower(), " ")
+    for intent, pattern in _INTENTS:
+        if pattern.search(text):
+            return intent
+    tokens = sorted({t for t in re.findall(r"[a-z0-9]+", text) if t not in _STOP})
+    return "q:" + " ".join(tokens)
+
+
+def budget_bucket(budget: Any) -> str:
+    try:
+        value = float(budget)
+    except (TypeError, ValueError):
+        return "unknown"
+    for limit, label in _BUDGET_BUCKETS:
+        if value < limit:
+            return label
+    return "100k+"
+
+
+def market_ttl(now: Optional[datetime] = None) -> float:
+    now = (now or datetime.now(_MARKET_TZ)).astimezone(_MARKET_TZ)
+    if now.weekday() < 5 and _OPEN <= now.time() < _CLOSE:
+        return TTL_MARKET_OPEN
+    next_open = now.replace(hour=_OPEN.hour, minute=_OPEN.minute, second=0, microsecond=0)
+    if now.time() >= _OPEN:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    return max(TTL_MARKET_OPEN, min(TTL_MARKET_CLOSED, (next_open - now).total_seconds()))
+
+
+class ResponseCache:
+    """Caches complete /analyze payloads keyed on the question's meaning rather than its wording."""
+
+    def __init__(self, maxsize: int = 1024):
+        self._cache = shared_cache.tiered("responses", maxsize, TTL_MARKET_OPEN)
+
+    @staticmethod
+    def key(ticker: str, company_name: str, question: str, profile: Dict[str, Any]) -> Tuple[str, ...]:
+        return (
+            ticker.upper(),
+            question_intent(question, ticker, company_name),
+            str(profile.get("risk_level") or profile.get("risk") or ""),
+            str(profile.get("horizon") or ""),
+            budget_bucket(profile.get("budget")),
+        )
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        payload = self._cache.get(key)
+        return copy.deepcopy(payload) if payload is not None else None
+
+    def set(self, key: Tuple[str, ...], payload: Dict[str, Any]) -> None:
+        self._cache.set(key, copy.deepcopy(payload), ttl=market_ttl())
+
+    async def aget(self, key: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        payload = await self._cache.aget(key)
+        return copy.deepcopy(payload) if payload is not None else None
+
+    async def aset(self, key: Tuple[str, ...], payload: Dict[str, Any]) -> None:
+        await self._cache.aset(key, copy.deepcopy(payload), ttl=market_ttl())
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+def refresh_price(payload: Dict[str, Any], quotes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    # Only live prices are refreshed; the analysis itself is reused as-is.
+    quote = quotes.get(str(payload.get("ticker", "")).upper(), {})
+    price = dict(payload.get("price_data") or {})
+    for field in ("current_price", "change_1d_pct", "currency"):
+        if quote.get(field) is not None:
+            price[field] = quote[field]
+    if quote.get("current_price") is not None:
+        price["source"] = quote.get("source", price.get("source"))
+    payload["price_data"] = price
+    for item in payload.get("shortlist", []):
+        quote = quotes.get(str(item.get("ticker", "")).upper(), {})
+        for field in ("current_price", "change_1d_pct"):
+            if quote.get(field) is not None:
+                item[field] = quote[field]
+    return payload
+
+
+response_cache = ResponseCache(maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", "1024")))
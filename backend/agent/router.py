@@ -0,0 +1,120 @@
+import functools
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+ROUTES = ("WEB", "LLM", "DOC")
+
+# Below this confidence the supervisor falls back to the LLM classifier.
+MIN_CONFIDENCE = float(os.environ.get("ROUTER_MIN_CONFIDENCE", "0.5"))
+ROUTER_MODEL_PATH = os.environ.get("ROUTER_MODEL_PATH", "")
+
+# (label, pattern, weight). Mirrors the supervisor prompt: time-sensitive,
+# price and earnings questions => WEB, explanations => LLM, internal docs => DOC.
+_RULES: List[Tuple[str, "re.Pattern[str]", float]] = [
+    ("WEB", re.compile(
+        r"\b(price|prices|quote|buy|sell|hold|invest(ing)?|news|earnings|guidance|revenue|eps|dividends?|"
+        r"today|now|latest|current(ly)?|recent(ly)?|this (week|month|quarter|year)|outlook|forecast|"
+        r"target|rally|drop(ped)?|crash|surge|stock|shares|q[1-4]|should i|worth)\b", re.I), 1.0),
+    ("WEB", re.compile(r"\$[A-Z]{1,5}\b|\([A-Z]{1,5}\)|\b[A-Z]{2,5}(\.[A-Z]{1,2})?\b"), 1.0),
+    ("LLM", re.compile(
+        r"\b(what (is|are|does)|define|definition|explain|meaning of|how (does|do)|"
+        r"difference between|why (do|does|is|are)|in simple terms|eli5)\b", re.I), 2.0),
+    ("DOC", re.compile(
+        r"\b(internal|our (docs?|documents?|polic(y|ies)|wiki|handbook|research)|playbook|memo|"
+        r"knowledge base|uploaded|attached|pdf)\b", re.I), 3.0),
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9$]+")
+
+
+class RouteDecision(NamedTuple):
+    label: str
+    confidence: float
+    source: str
+
+
+def classify_by_rules(question: str) -> Tuple[str, float]:
+    scores = {label: 0.0 for label in ROUTES}
+    for label, pattern, weight in _RULES:
+        scores[label] += weight * len(pattern.findall(question))
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (top_label, top), (_, second) = ranked[0], ranked[1]
+    if top <= 0:
+        return "WEB", 0.0
+    return top_label, (top - second) / top
+
+
+class NaiveBayesRouter:
+    """Small multinomial naive Bayes model, stored as JSON, for questions the rules cannot settle."""
+
+    def __init__(self, priors: Dict[str, float], token_log_probs: Dict[str, Dict[str, float]], unknown: Dict[str, float]):
+        self.priors = priors
+        self.token_log_probs = token_log_probs
+        self.unknown = unknown
+
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str]], alpha: float = 1.0) -> "NaiveBayesRouter":
+        label_counts: Counter = Counter()
+        token_counts: Dict[str, Counter] = defaultdict(Counter)
+        vocab = set()
+        for text, label in examples:
+            label_counts[label] += 1
+            tokens = _TOKEN_RE.findall(text.lower())
+            token_counts[label].update(tokens)
+            vocab.update(tokens)
+        total = sum(label_counts.values())
+        priors, log_probs, unknown = {}, {}, {}
+        for label, count in label_counts.items():
+            denom = sum(token_counts[label].values()) + alpha * (len(vocab) + 1)
+            priors[label] = math.log(count / total)
+            log_probs[label] = {t: math.log((c + alpha) / denom) for t, c in token_counts[label].items()}
+            unknown[label] = math.log(alpha / denom)
+        return cls(priors, log_probs, unknown)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesRouter":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["priors"], data["token_log_probs"], data["unknown"])
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"priors": self.priors, "token_log_probs": self.token_log_probs, "unknown": self.unknown}, f)
+
+    def predict(self, question: str) -> Tuple[str, float]:
+        tokens = _TOKEN_RE.findall(question.lower())
+        scores = {}
+        for label, prior in self.priors.items():
+            table = self.token_log_probs[label]
+            scores[label] = prior + sum(table.get(t, self.unknown[label]) for t in tokens)
+        best = max(scores, key=scores.get)
+        # Softmax probability of the winning label.
+        norm = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / norm
+
+
+@functools.lru_cache(maxsize=1)
+def _load_model() -> Optional[NaiveBayesRouter]:
+    if not ROUTER_MODEL_PATH:
+        return None
+    try:
+        return NaiveBayesRouter.load(ROUTER_MODEL_PATH)
+    except Exception:
+        return None
+
+
+def classify_route(question: str) -> Optional[RouteDecision]:
+    # Returns None when neither the rules nor the optional model are confident.
+    label, confidence = classify_by_rules(question)
+    if confidence >= MIN_CONFIDENCE:
+        return RouteDecision(label, confidence, "rules")
+    model = _load_model()
+    if model is not None:
+        label, confidence = model.predict(question)
+        if label in ROUTES and confidence >= MIN_CONFIDENCE:
+            return RouteDecision(label, confidence, "model")
+    return None
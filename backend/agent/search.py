@@ -0,0 +1,27 @@
+from typing import Dict, List, Optional
+
+from ddgs import DDGS
+from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+from pydantic import PrivateAttr
+
+
+class PooledDuckDuckGoSearch(DuckDuckGoSearchAPIWrapper):
+    """DuckDuckGo wrapper that keeps one DDGS session for the life of the process.
+
+    The stock wrapper opens a new DDGS, and with it new engine HTTP clients, for
+    every query; keeping one lets searches reuse the engines' keep-alive connections.
+    """
+
+    _ddgs: DDGS = PrivateAttr(default_factory=DDGS)
+
+    def _ddgs_text(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, str]]:
+        return self._ddgs.text(
+            query, region=self.region, safesearch=self.safesearch, timelimit=self.time,
+            max_results=max_results or self.max_results, backend=self.backend
+        ) or []
+
+    def _ddgs_news(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, str]]:
+        return self._ddgs.news(
+            query, region=self.region, safesearch=self.safesearch, timelimit=self.time,
+            max_results=max_results or self.max_results
+        ) or []
@@ -0,0 +1,75 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from .cache import RedisCache, SQLiteCache, TieredCache, TTLCache
+
+# Shared tier behind every per-process cache (market data, evidence, symbols, quotes,
+# LLM responses), so several workers fetch each item once between them:
+#   memory - no shared tier; each process keeps its own caches (single worker)
+#   sqlite - one SQLite file in WAL mode shared by every worker on the host; point
+#            CACHE_DB at /dev/shm to keep it in shared memory
+#   redis  - a Redis-compatible server at CACHE_URL, shared across hosts; needs the
+#            redis package, and falls back to the SQLite stand-in when it is missing
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").strip().lower()
+CACHE_DB = os.environ.get("CACHE_DB", "shared_cache.db")
+CACHE_URL = os.environ.get("CACHE_URL", "redis://localhost:6379/0")
+# Key prefix, so several deployments can share one Redis database.
+CACHE_PREFIX = os.environ.get("CACHE_PREFIX", "finsight")
+
+logger = logging.getLogger(__name__)
+
+_backend: Optional[Any] = None
+_resolved = False
+_caches: List[TieredCache] = []
+
+
+def _open_backend(kind: str) -> Optional[Any]:
+    if kind == "sqlite":
+        return SQLiteCache(CACHE_DB)
+    if kind == "redis":
+        try:
+            import redis
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; using the SQLite cache at %s", CACHE_DB)
+            return SQLiteCache(CACHE_DB)
+        return RedisCache(redis.Redis.from_url(CACHE_URL, socket_timeout=1.0), CACHE_URL)
+    return None
+
+
+def backend() -> Optional[Any]:
+    global _backend, _resolved
+    if not _resolved:
+        _backend = _open_backend(CACHE_BACKEND)
+        _resolved = True
+    return _backend
+
+
+def set_backend(shared: Optional[Any]) -> None:
+    """Swaps the shared tier of every cache (a Redis stand-in, a test double, or None)."""
+    global _backend, _resolved
+    _backend, _resolved = shared, True
+    for cache in _caches:
+        cache.shared = shared
+
+
+def tiered(namespace: str, maxsize: int, ttl: float, shared: Optional[Any] = None) -> TieredCache:
+    # `shared` pins a cache to its own backend (MARKET_CACHE_DB) instead of CACHE_BACKEND.
+    cache = TieredCache(
+        TTLCache(maxsize=maxsize, ttl=ttl),
+        shared if shared is not None else backend(),
+        namespace=f"{CACHE_PREFIX}:{namespace}"
+    )
+    if shared is None:
+        _caches.append(cache)
+    return cache
+
+
+def stats() -> Dict[str, Any]:
+    shared = backend()
+    if shared is None:
+        return {"backend": "memory"}
+    try:
+        return shared.stats()
+    except Exception as e:
+        return {"backend": CACHE_BACKEND, "error": str(e)}
@@ -0,0 +1,52 @@
+from typing import TypedDict, Literal, List, Dict, Any, Optional
+from langchain_core.messages import BaseMessage
+
+# --- Domain Models ---
+
+class UserProfile(TypedDict, total=False):
+    budget: float
+    risk_level: Literal["low", "medium", "high"]
+    horizon: str
+    country: str
+
+class ValidationResult(TypedDict, total=False):
+    status: Literal["PASS", "FAIL"]
+    reasons: List[str]
+    suggested_route: Literal["WEB", "LLM", "DOC", "YFINANCE", "INTAKE"]
+
+class AnalystState(TypedDict, total=False):
+    messages: List[BaseMessage]
+    
+    # Decisions
+    route: Literal["WEB", "LLM", "DOC", "YFINANCE", "INTAKE"]
+    route_source: Literal["rules", "model", "llm"]
+    route_confidence: Optional[float]
+    plan: str
+    
+    # Data
+    ticker: str
+    company_name: str
+    tickers: List[str]
+    user_profile: UserProfile
+    missing_fields: List[str]
+    web_evidence: List[Dict[str, Any]]
+    price_data: Dict[str, Any]
+    fundamentals: Dict[str, Any]
+    last_quarter: Dict[str, Any]
+
+    # Comparison mode: per-ticker data when several tickers are analyzed
+    evidence_by_ticker: Dict[str, List[Dict[str, Any]]]
+    price_data_by_ticker: Dict[str, Dict[str, Any]]
+    last_quarter_by_ticker: Dict[str, Dict[str, Any]]
+    # Volatility / drawdown / momentum / beta over the profile horizon, per ticker
+    price_metrics_by_ticker: Dict[str, Dict[str, Any]]
+    
+    # Outputs
+    frame: str
+    draft: Dict[str, Any]
+    shortlist: List[Dict[str, Any]]
+    validation: ValidationResult
+    
+    # Retry logic
+    retry_count: int
+    reminder: str
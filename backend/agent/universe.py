@@ -0,0 +1,69 @@
+import functools
+import heapq
+import itertools
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Tuple
+
+UNIVERSE_PATH = os.environ.get(
+    "STOCK_UNIVERSE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "stock_universe.json")
+)
+PICKS_PER_MARKET = 6
+
+
+class UniverseIndex:
+    """Stock universe indexed by (risk, horizon, market).
+
+    A pick's score depends only on whether its risk matches the profile (+3),
+    whether it covers the profile horizon (+2) and a +1 nudge for medium-risk
+    names on high-risk profiles. Every index bucket therefore holds items of a
+    single score, already in file order, and ranking is a merge of the top
+    buckets instead of a sort over the whole universe.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self.markets: List[str] = []
+        self._by_key: Dict[Tuple[str, str, str], List[int]] = defaultdict(list)
+        self._by_risk_market: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, item in enumerate(items):
+            market = item["market"]
+            if market not in self.markets:
+                self.markets.append(market)
+            self._by_risk_market[(item["risk"], market)].append(i)
+            for horizon in item.get("horizon", []):
+                self._by_key[(item["risk"], horizon, market)].append(i)
+        self.risks = sorted({item["risk"] for item in items})
+
+    def _streams(self, risk: str, horizon: str, market: str) -> Dict[int, List[Iterator[int]]]:
+        streams: Dict[int, List[Iterator[int]]] = defaultdict(list)
+        for item_risk in self.risks:
+            base = 3 if item_risk == risk else 0
+            if risk == "high" and item_risk == "medium":
+                base += 1
+            streams[base + 2].append(iter(self._by_key.get((item_risk, horizon, market), [])))
+            streams[base].append(
+                i for i in self._by_risk_market.get((item_risk, market), [])
+                if horizon not in self.items[i].get("horizon", [])
+            )
+        return streams
+
+    @functools.lru_cache(maxsize=256)
+    def top(self, risk: str, horizon: str, market: str, n: int = PICKS_PER_MARKET) -> Tuple[Dict[str, Any], ...]:
+        streams = self._streams(risk, horizon, market)
+        # Same-score buckets are merged by file position so ties keep file order.
+        ranked = itertools.chain.from_iterable(
+            heapq.merge(*streams[score]) for score in sorted(streams, reverse=True)
+        )
+        return tuple(self.items[i] for i in itertools.islice(ranked, n))
+
+    def picks(self, risk: str, horizon: str, n: int = PICKS_PER_MARKET) -> List[Dict[str, Any]]:
+        return [item for market in self.markets for item in self.top(risk, horizon, market, n)]
+
+
+@functools.lru_cache(maxsize=1)
+def get_universe() -> UniverseIndex:
+    with open(UNIVERSE_PATH, encoding="utf-8") as f:
+        return UniverseIndex(json.load(f))
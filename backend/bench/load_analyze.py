@@ -0,0 +1,153 @@
+"""Concurrent /analyze load test with simulated upstream latency.
+
+Groq, DuckDuckGo and yfinance are replaced by fakes that sleep for a fixed
+latency, so the numbers reflect how well one worker overlaps I/O rather than
+live network conditions. Throughput should grow with concurrency until the
+I/O executor (IO_WORKERS) saturates. Each request asks about a different
+ticker with caches cleared first, so no request is answered from the response,
+market-data or single-flight caches of another.
+
+    python bench/load_analyze.py --levels 1,4,16,32 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "bench")
+# Caches are cleared before every request, so the stores stay in memory.
+os.environ.setdefault("NEWS_STORE_DB", ":memory:")
+os.environ.setdefault("BATCH_DB", ":memory:")
+os.environ.setdefault("PREFETCH_ENABLED", "0")
+# Fakes stand in for the upstreams; rate limits would cap the measured throughput.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("RATE_LIMIT_DB", ":memory:")
+
+import httpx
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from replay import reset_caches
+
+TICKERS = ["NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA", "AMD", "INTC", "ORCL", "CRM", "ADBE",
+           "NFLX", "QCOM", "AVGO", "CSCO", "IBM", "SHOP", "UBER", "PYPL", "SQ", "SNOW", "PLTR", "MU"]
+
+DRAFT = json.dumps({
+    "executive_summary": "Recommendation: YES; Expected growth strength: Medium; Risk points: volatility",
+    "expected_return": "4-8% over 6m",
+    "news_summary": ["Demand remains strong."],
+    "bull_case": ["Data-center growth."],
+    "bear_case": ["Valuation risk."],
+    "key_risks": ["Export restrictions."],
+    "last_quarter_result": ""
+})
+
+
+class SleepyChatModel(FakeListChatModel):
+    latency: float = 0.2
+
+    def _reply(self, messages) -> str:
+        text = messages[0].content if messages else ""
+        if "Classify query" in text:
+            return "WEB"
+        if "Prepare analysis frame" in text:
+            return "1) Assumptions"
+        return DRAFT
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _message(self, messages, tools) -> AIMessage:
+        # With a bound tool (the structured draft), the JSON reply becomes its call.
+        text = self._reply(messages)
+        if tools and text == DRAFT:
+            call = {"name": tools[0]["function"]["name"], "args": json.loads(text), "id": "call_sleepy"}
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=text)
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+
+def install_fakes(latency: float) -> None:
+    import yfinance as yf
+    from agent.clients import clients
+
+    class SleepySearch:
+        def results(self, query, max_results=5, **kwargs):
+            time.sleep(latency)
+            return [{"title": f"{query} {i}", "link": f"https://example.com/{i}", "snippet": "Snippet"} for i in range(max_results)]
+
+    class SleepyTicker:
+        def __init__(self, ticker, session=None):
+            self.ticker = ticker
+
+        @property
+        def info(self):
+            time.sleep(latency)
+            return {"currency": "USD", "longName": f"{self.ticker} Inc."}
+
+        @property
+        def fast_info(self):
+            return {"last_price": 101.0, "previous_close": 100.0}
+
+        @property
+        def quarterly_earnings(self):
+            return None
+
+    clients.set("llm", SleepyChatModel(responses=[""], latency=latency))
+    clients.set("ddgs", SleepySearch())
+    yf.Ticker = SleepyTicker
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, rounds: int) -> float:
+    async def one(i: int):
+        # Concurrent requests differ in ticker, so they cannot share an in-flight call.
+        body = {
+            "question": f"Should I buy {TICKERS[i % len(TICKERS)]}?",
+            "profile": {"budget": 1000 + i, "risk": "medium", "horizon": "6m"}
+        }
+        reset_caches()
+        resp = await client.post("/analyze", json=body)
+        resp.raise_for_status()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return (concurrency * rounds) / elapsed
+
+
+async def main(levels, rounds: int, latency: float) -> None:
+    install_fakes(latency)
+    import main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Unmeasured: the first request builds the graph and lazy clients.
+        await run_level(client, 1, 1)
+        print(f"{'concurrency':>12} {'req/s':>10} {'speedup':>10}")
+        baseline = None
+        for level in levels:
+            rps = await run_level(client, level, rounds)
+            baseline = baseline or rps
+            print(f"{level:>12} {rps:>10.2f} {rps / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated seconds per upstream call")
+    args = parser.parse_args()
+    asyncio.run(main([int(x) for x in args.levels.split(",")], args.rounds, args.latency))
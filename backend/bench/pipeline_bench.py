@@ -0,0 +1,238 @@
+"""Offline benchmark of the analysis pipeline against recorded fixtures.
+
+Replays Groq, DuckDuckGo, yfinance and Yahoo quote responses from a fixtures
+file (see bench/replay.py), drives both graph.ainvoke and the FastAPI app with
+a weighted question mix, and reports p50/p95/p99 latency and throughput per
+request, per node and per upstream, plus memory allocated per node.
+
+    python bench/pipeline_bench.py                       # recorded latencies
+    python bench/pipeline_bench.py --latency-scale 0     # pure pipeline overhead
+    python bench/pipeline_bench.py --record              # live run, refresh fixtures
+
+Caches are cleared before every request unless --warm is given.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("NEWS_STORE_DB", ":memory:")
+os.environ.setdefault("BATCH_DB", ":memory:")
+# Measures the pipeline itself; upstream rate limits would only add queueing.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("RATE_LIMIT_DB", ":memory:")
+
+import httpx
+import numpy as np
+
+from replay import Fixtures, install_recorder, install_replay, reset_caches
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recorded.json")
+
+
+def sample_questions(fixtures: Fixtures, n: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    weights = [q.get("weight", 1) for q in fixtures.questions]
+    return rng.choices(fixtures.questions, weights=weights, k=n)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"n": len(values), "p50": round(float(p50), 1), "p95": round(float(p95), 1), "p99": round(float(p99), 1)}
+
+
+class Run:
+    def __init__(self, target: str):
+        self.target = target
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.spans: Dict[str, List[float]] = defaultdict(list)
+        self.wall = 0.0
+
+    def add(self, ms: float, trace: List[Dict[str, Any]]) -> None:
+        self.latencies.append(ms)
+        for span in trace:
+            self.spans[f"{span['kind']}:{span['name']}"].append(span["ms"])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "target": self.target,
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(self.latencies) / self.wall, 2) if self.wall else 0.0,
+            "latency_ms": percentiles(self.latencies),
+            "spans_ms": {name: percentiles(v) for name, v in sorted(self.spans.items())},
+        }
+
+
+async def _drive(questions: List[Dict[str, Any]], concurrency: int, warm: bool, one) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def guarded(q):
+        async with sem:
+            if not warm:
+                reset_caches()
+            await one(q)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(guarded(q) for q in questions))
+    return time.perf_counter() - start
+
+
+async def bench_graph(questions, concurrency: int, warm: bool) -> Run:
+    import main
+    from agent.graph import graph
+    from agent.metrics import start_trace
+    from agent.models import AnalyzeRequest
+
+    run = Run("graph")
+
+    async def one(q):
+        trace = start_trace()
+        state = main._initial_state(AnalyzeRequest(question=q["question"], profile=q["profile"]))
+        started = time.perf_counter()
+        try:
+            await graph.ainvoke(state)
+        except Exception:
+            run.errors += 1
+            return
+        run.add((time.perf_counter() - started) * 1000, trace.to_list())
+
+    run.wall = await _drive(questions, concurrency, warm, one)
+    return run
+
+
+async def bench_app(questions, concurrency: int, warm: bool) -> Run:
+    import main
+
+    run = Run("app")
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def one(q):
+            started = time.perf_counter()
+            resp = await client.post("/analyze", json={"question": q["question"], "profile": q["profile"]})
+            if resp.status_code != 200:
+                run.errors += 1
+                return
+            run.add((time.perf_counter() - started) * 1000, resp.json().get("trace", []))
+
+        run.wall = await _drive(questions, concurrency, warm, one)
+    return run
+
+
+async def node_memory(fixtures: Fixtures) -> Dict[str, Dict[str, float]]:
+    # One question at a time with branch concurrency 1, so each node's
+    # allocations are not mixed with its siblings'.
+    import main
+    from agent import graph as graph_module
+    from agent.models import AnalyzeRequest
+
+    measured: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: {"peak": [], "retained": []})
+    original = graph_module.track_node
+
+    @contextlib.contextmanager
+    def measuring(node: str):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        with original(node):
+            yield
+        after, peak = tracemalloc.get_traced_memory()
+        measured[node]["peak"].append((peak - before) / 1024)
+        measured[node]["retained"].append((after - before) / 1024)
+
+    graph_module.track_node = measuring
+    tracemalloc.start()
+    try:
+        for q in fixtures.questions:
+            reset_caches()
+            state = main._initial_state(AnalyzeRequest(question=q["question"], profile=q["profile"]))
+            await graph_module.graph.ainvoke(state, config={"max_concurrency": 1})
+    finally:
+        tracemalloc.stop()
+        graph_module.track_node = original
+    return {
+        node: {"peak_kib_max": round(max(v["peak"]), 1), "retained_kib_mean": round(sum(v["retained"]) / len(v["retained"]), 1)}
+        for node, v in sorted(measured.items())
+    }
+
+
+def print_run(summary: Dict[str, Any]) -> None:
+    lat = summary["latency_ms"]
+    print(f"\n== {summary['target']}: {summary['requests']} requests, {summary['errors']} errors, "
+          f"{summary['throughput_rps']} req/s")
+    print(f"{'':34} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print(f"{'request':34} {lat['n']:>5} {lat['p50']:>9} {lat['p95']:>9} {lat['p99']:>9}")
+    for name, p in summary["spans_ms"].items():
+        print(f"  {name:32} {p['n']:>5} {p['p50']:>9} {p['p95']:>9} {p['p99']:>9}")
+
+
+def print_memory(memory: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n== memory per node (tracemalloc)\n{'node':34} {'peak KiB':>10} {'retained KiB':>13}")
+    for node, m in memory.items():
+        print(f"  {node:32} {m['peak_kib_max']:>10} {m['retained_kib_mean']:>13}")
+
+
+async def record(path: str, seed: int) -> None:
+    fixtures = Fixtures.load(path) if os.path.exists(path) else Fixtures()
+    finish = install_recorder(fixtures)
+    import main
+    from agent.graph import graph
+    from agent.models import AnalyzeRequest
+
+    for q in fixtures.questions:
+        print(f"recording: {q['question']}")
+        state = main._initial_state(AnalyzeRequest(question=q["question"], profile=q["profile"]))
+        await graph.ainvoke(state)
+    finish()
+    fixtures.save(path)
+    print(f"saved {path}")
+
+
+async def main_async(args) -> None:
+    if args.record:
+        await record(args.fixtures, args.seed)
+        return
+    fixtures = Fixtures.load(args.fixtures)
+    install_replay(fixtures, latency_scale=args.latency_scale, seed=args.seed)
+    questions = sample_questions(fixtures, args.requests, args.seed)
+
+    report: Dict[str, Any] = {"config": {k: v for k, v in vars(args).items() if k != "record"}, "runs": []}
+    targets = ["graph", "app"] if args.target == "both" else [args.target]
+    for target in targets:
+        reset_caches()
+        bench = bench_graph if target == "graph" else bench_app
+        summary = (await bench(questions, args.concurrency, args.warm)).summary()
+        report["runs"].append(summary)
+        print_run(summary)
+    if not args.no_memory:
+        report["memory"] = await node_memory(fixtures)
+        print_memory(report["memory"])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--target", choices=["graph", "app", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded upstream latency")
+    parser.add_argument("--warm", action="store_true", help="keep caches between requests")
+    parser.add_argument("--no-memory", action="store_true", help="skip the per-node memory pass")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--record", action="store_true", help="run the question mix live and save fixtures")
+    asyncio.run(main_async(parser.parse_args()))
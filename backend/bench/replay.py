@@ -0,0 +1,418 @@
+"""Record/replay layer for Groq, DuckDuckGo, yfinance and Yahoo quotes.
+
+Replay mode swaps every external dependency for fixtures loaded from JSON,
+optionally sleeping a recorded per-source latency, so the pipeline can be
+benchmarked offline and reproducibly. Record mode wraps the live clients and
+writes what they returned into the same format.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent.clients import clients
+from agent.metrics import track_call
+from agent.rate_limit import rate_limiter
+
+# Prompt templates are told apart by their opening instruction.
+_PROMPT_KINDS = (("Classify query", "supervisor"), ("Prepare analysis frame", "frame"))
+
+
+def prompt_kind(text: str) -> str:
+    for marker, kind in _PROMPT_KINDS:
+        if marker in text:
+            return kind
+    return "draft"
+
+
+def prompt_hash(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+class Fixtures:
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.latency: Dict[str, float] = data.get("latency", {})
+        self.questions: List[Dict[str, Any]] = data.get("questions", [])
+        self.llm: Dict[str, Any] = data.get("llm", {})
+        self.search: Dict[str, List[Dict[str, Any]]] = data.get("search", {})
+        self.symbols: Dict[str, List[Dict[str, Any]]] = data.get("symbols", {})
+        self.tickers: Dict[str, Dict[str, Any]] = data.get("tickers", {})
+        self.quotes: Dict[str, Dict[str, Any]] = data.get("quotes", {})
+
+    @classmethod
+    def load(cls, path: str) -> "Fixtures":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: str) -> None:
+        data = {
+            "latency": self.latency, "questions": self.questions, "llm": self.llm, "search": self.search,
+            "symbols": self.symbols, "tickers": self.tickers, "quotes": self.quotes
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, default=str)
+
+
+class _Latency:
+    def __init__(self, fixtures: Fixtures, scale: float, seed: int):
+        self.fixtures = fixtures
+        self.scale = scale
+        self._rng = random.Random(seed)
+
+    def __call__(self, source: str) -> float:
+        base = self.fixtures.latency.get(source, 0.0) * self.scale
+        # Mild right skew, like real upstreams.
+        return base * self._rng.lognormvariate(0, 0.25) if base else 0.0
+
+    def sleep(self, source: str) -> None:
+        delay = self(source)
+        if delay:
+            time.sleep(delay)
+
+
+def _frame(payload: Optional[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+    if not payload:
+        return None
+    return pd.DataFrame(payload["columns"], index=pd.Index(payload["index"]))
+
+
+def _unframe(df: Any) -> Optional[Dict[str, Any]]:
+    if df is None or not hasattr(df, "empty") or df.empty:
+        return None
+    return {
+        "index": [str(i) for i in df.index],
+        "columns": {str(c): [None if pd.isna(v) else float(v) for v in df[c]] for c in df.columns}
+    }
+
+
+# --- Replay ---
+
+class ReplayChatModel(FakeListChatModel):
+    """Answers from recorded outputs: exact prompt match first, then the prompt kind's default."""
+
+    fixtures: Any = None
+    latency: Any = None
+
+    def _reply(self, messages) -> str:
+        text = messages[0].content if messages else ""
+        llm = self.fixtures.llm
+        exact = llm.get("by_prompt", {}).get(prompt_hash(text))
+        if exact is not None:
+            return exact
+        reply = llm.get(prompt_kind(text), "")
+        return reply if isinstance(reply, str) else json.dumps(reply)
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _usage(self, messages, text: str) -> Dict[str, int]:
+        usage = {"input_tokens": len(messages[0].content) // 4 if messages else 0, "output_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return usage
+
+    def _message(self, messages, tools) -> AIMessage:
+        # With a bound tool (structured output), a JSON reply becomes its call.
+        text = self._reply(messages)
+        if tools:
+            try:
+                args = json.loads(text)
+            except ValueError:
+                args = None
+            if isinstance(args, dict):
+                call = {"name": tools[0]["function"]["name"], "args": args, "id": "call_replay"}
+                return AIMessage(content="", tool_calls=[call], usage_metadata=self._usage(messages, text))
+        return AIMessage(content=text, usage_metadata=self._usage(messages, text))
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        self.latency.sleep("groq")
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        delay = self.latency("groq")
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, tools))])
+
+    def _chunks(self, message: AIMessage, size: int = 48):
+        # Tool arguments or text in small pieces, usage on the last one, like a live stream.
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            args = json.dumps(call["args"])
+            pieces = [args[i:i + size] for i in range(0, len(args), size)] or [""]
+            for i, piece in enumerate(pieces):
+                yield AIMessageChunk(content="", tool_call_chunks=[{
+                    "name": call["name"] if i == 0 else None, "args": piece,
+                    "id": call["id"] if i == 0 else None, "index": 0
+                }], usage_metadata=message.usage_metadata if i == len(pieces) - 1 else None)
+        else:
+            text = message.content
+            pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+            for i, piece in enumerate(pieces):
+                yield AIMessageChunk(content=piece, usage_metadata=message.usage_metadata if i == len(pieces) - 1 else None)
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        self.latency.sleep("groq")
+        for chunk in self._chunks(self._message(messages, tools)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        delay = self.latency("groq")
+        if delay:
+            await asyncio.sleep(delay)
+        for chunk in self._chunks(self._message(messages, tools)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+
+class ReplaySearch:
+    max_results = 5
+
+    def __init__(self, fixtures: Fixtures, latency: _Latency):
+        self.fixtures = fixtures
+        self.latency = latency
+
+    def results(self, query: str, max_results: int = 5, **kwargs) -> List[Dict[str, Any]]:
+        self.latency.sleep("ddgs")
+        recorded = self.fixtures.search.get(query)
+        if recorded is None:
+            # Unrecorded queries get generic items naming the target.
+            target = query.split(" latest news")[0]
+            recorded = [
+                {"title": f"{target} headline {i + 1}", "link": f"https://news.example.com/{target.lower()}/{i + 1}",
+                 "snippet": f"{target} coverage item {i + 1}.", "date": "2025-01-15"}
+                for i in range(5)
+            ]
+        return recorded[:max_results]
+
+
+def replay_ticker_class(fixtures: Fixtures, latency: _Latency):
+    class ReplayTicker:
+        def __init__(self, ticker: str, session=None):
+            self.ticker = ticker
+            self._data = fixtures.tickers.get(ticker.upper(), {})
+
+        @property
+        def info(self):
+            latency.sleep("yf_info")
+            return dict(self._data.get("info", {}))
+
+        @property
+        def fast_info(self):
+            latency.sleep("yf_price")
+            return dict(self._data.get("fast_info", {}))
+
+        def history(self, period: str = "5d", start=None, **kwargs):
+            latency.sleep("yf_history")
+            if not self._data.get("history"):
+                return pd.DataFrame()
+            df = _frame(self._data["history"])
+            df.index = pd.to_datetime(df.index, utc=True).tz_localize(None)
+            if start is not None:
+                return df[df.index >= pd.Timestamp(start)]
+            if period.endswith("d"):
+                return df.tail(int(period[:-1]))
+            return df
+
+        @property
+        def quarterly_earnings(self):
+            latency.sleep("yf_earnings")
+            return _frame(self._data.get("quarterly_earnings"))
+
+    return ReplayTicker
+
+
+def replay_search_class(fixtures: Fixtures, latency: _Latency):
+    class ReplaySymbolSearch:
+        def __init__(self, query: str, *args, **kwargs):
+            latency.sleep("yf_search")
+            self.quotes = fixtures.symbols.get(query.strip().lower(), [])
+
+    return ReplaySymbolSearch
+
+
+def install_replay(fixtures: Fixtures, latency_scale: float = 1.0, seed: int = 7) -> None:
+    import yfinance as yf
+    from agent import nodes, quotes
+
+    latency = _Latency(fixtures, latency_scale, seed)
+
+    def lookup(symbols) -> Dict[str, Dict[str, Any]]:
+        return quotes.parse_quote_response(
+            {"quoteResponse": {"result": [fixtures.quotes[s] for s in quotes._normalize(symbols) if s in fixtures.quotes]}}
+        )
+
+    def fetch_quotes(symbols):
+        with track_call("yahoo_quote"):
+            latency.sleep("yahoo_quote")
+            return lookup(symbols)
+
+    async def afetch_quotes(symbols):
+        with track_call("yahoo_quote"):
+            delay = latency("yahoo_quote")
+            if delay:
+                await asyncio.sleep(delay)
+            return lookup(symbols)
+
+    clients.set("llm", ReplayChatModel(responses=[""], fixtures=fixtures, latency=latency))
+    clients.set("ddgs", ReplaySearch(fixtures, latency))
+    nodes.fetch_quotes = fetch_quotes
+    quotes.afetch_quotes = afetch_quotes
+    yf.Ticker = replay_ticker_class(fixtures, latency)
+    yf.Search = replay_search_class(fixtures, latency)
+
+
+def reset_caches() -> None:
+    # Every run starts cold unless the caller asks for warm caches.
+    from agent import nodes, quotes
+    from agent.response_cache import response_cache
+
+    nodes._market_cache.clear()
+    nodes._symbol_cache.clear()
+    nodes._news_cache.clear()
+    nodes.news_store.clear()
+    nodes.price_history.clear()
+    quotes._quote_cache.clear()
+    response_cache._cache.clear()
+    rate_limiter.clear()
+
+
+# --- Record ---
+
+class _Samples:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, source: str, seconds: float) -> None:
+        self.samples.setdefault(source, []).append(seconds)
+
+    def timed(self, source: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.add(source, time.perf_counter() - start)
+
+    def medians(self) -> Dict[str, float]:
+        return {s: round(sorted(v)[len(v) // 2], 3) for s, v in self.samples.items() if v}
+
+
+class _LLMRecorder(BaseCallbackHandler):
+    def __init__(self, fixtures: Fixtures, samples: _Samples):
+        self.fixtures = fixtures
+        self.samples = samples
+        self._runs: Dict[Any, Any] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        prompt = messages[0][0].content if messages and messages[0] else ""
+        self._runs[run_id] = (prompt, time.perf_counter())
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        prompt, start = self._runs.pop(run_id, ("", time.perf_counter()))
+        self.samples.add("groq", time.perf_counter() - start)
+        generation = response.generations[0][0]
+        calls = getattr(getattr(generation, "message", None), "tool_calls", None)
+        # Structured-output drafts are recorded as their tool-call arguments.
+        text = json.dumps(calls[0]["args"]) if calls else generation.text
+        self.fixtures.llm.setdefault("by_prompt", {})[prompt_hash(prompt)] = text
+        self.fixtures.llm.setdefault(prompt_kind(prompt), text)
+
+
+def install_recorder(fixtures: Fixtures):
+    """Wraps the live clients; returns a callable that stores median latencies into the fixtures."""
+    import yfinance as yf
+    from agent import nodes, quotes
+
+    samples = _Samples()
+    real_ticker, real_search = yf.Ticker, yf.Search
+    real_wrapper = clients.get("ddgs")
+    real_fetch, real_afetch = quotes.fetch_quotes, quotes.afetch_quotes
+
+    class RecordingTicker:
+        def __init__(self, ticker: str, session=None):
+            self.ticker = ticker.upper()
+            self._real = real_ticker(ticker)
+            self._data = fixtures.tickers.setdefault(self.ticker, {})
+
+        @property
+        def info(self):
+            info = samples.timed("yf_info", lambda: self._real.info) or {}
+            self._data["info"] = {k: info.get(k) for k in ("currency", "longName", "shortName")}
+            return info
+
+        @property
+        def fast_info(self):
+            fast = samples.timed("yf_price", lambda: self._real.fast_info) or {}
+            self._data["fast_info"] = {k: fast.get(k) for k in ("last_price", "previous_close")}
+            return fast
+
+        def history(self, period: str = "5d", **kwargs):
+            df = samples.timed("yf_history", self._real.history, period=period, **kwargs)
+            # Keep the longest download (the price-history store's) over the 5d price fallback.
+            recorded = _unframe(df) or {}
+            if len(recorded.get("index", [])) >= len((self._data.get("history") or {}).get("index", [])):
+                self._data["history"] = recorded
+            return df
+
+        @property
+        def quarterly_earnings(self):
+            df = samples.timed("yf_earnings", lambda: self._real.quarterly_earnings)
+            self._data["quarterly_earnings"] = _unframe(df)
+            return df
+
+    def recording_search(query: str, *args, **kwargs):
+        search = samples.timed("yf_search", real_search, query, *args, **kwargs)
+        fixtures.symbols[query.strip().lower()] = list(getattr(search, "quotes", []) or [])[:3]
+        return search
+
+    class RecordingWrapper:
+        max_results = real_wrapper.max_results
+
+        def results(self, query: str, max_results: int = 5, **kwargs):
+            results = samples.timed("ddgs", real_wrapper.results, query, max_results=max_results, **kwargs)
+            fixtures.search[query] = results
+            return results
+
+    def record_quotes(result: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        for symbol, quote in result.items():
+            price, change = quote.get("current_price"), quote.get("change_1d_pct")
+            fixtures.quotes[symbol] = {
+                "symbol": symbol, "currency": quote.get("currency"), "longName": quote.get("company_name"),
+                "regularMarketPrice": price,
+                "regularMarketPreviousClose": price / (1 + change / 100) if price is not None and change is not None else None
+            }
+        return result
+
+    def fetch_quotes(symbols):
+        return record_quotes(samples.timed("yahoo_quote", real_fetch, symbols))
+
+    async def afetch_quotes(symbols):
+        start = time.perf_counter()
+        try:
+            return record_quotes(await real_afetch(symbols))
+        finally:
+            samples.add("yahoo_quote", time.perf_counter() - start)
+
+    clients.set("llm", clients.get("llm").with_config(callbacks=[_LLMRecorder(fixtures, samples)]))
+    clients.set("ddgs", RecordingWrapper())
+    nodes.fetch_quotes = fetch_quotes
+    quotes.afetch_quotes = afetch_quotes
+    yf.Ticker = RecordingTicker
+    yf.Search = recording_search
+
+    def finish() -> None:
+        fixtures.latency.update(samples.medians())
+
+    return finish
@@ -0,0 +1,126 @@
+"""Cold-start benchmark: process launch to first healthy /health and /recommendations.
+
+Starts uvicorn in a fresh interpreter per run, polls /health until it answers,
+then posts one /recommendations request, and reports the elapsed times plus the
+bare `import main` time and which heavy libraries that import pulled in. Quotes
+point at a closed local port so the result measures the app, not Yahoo.
+
+    python bench/startup_bench.py                 # 5 runs, fails above 1s
+    python bench/startup_bench.py --runs 10 --max-seconds 0.8
+
+Exits non-zero when the median time to /recommendations exceeds --max-seconds
+or `import main` loads any of the libraries that should stay lazy.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded by the lifespan warm-up or first /analyze, never by importing main.
+LAZY_MODULES = ["langchain_core", "langchain_groq", "langchain_community", "langgraph", "yfinance", "pandas", "numpy"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "bench")
+    env.setdefault("PREFETCH_ENABLED", "0")
+    env.setdefault("NEWS_STORE_DB", ":memory:")
+    env.setdefault("BATCH_DB", ":memory:")
+    env.setdefault("RATE_LIMIT_DB", ":memory:")
+    env.setdefault("YAHOO_QUOTE_URL", "http://127.0.0.1:9/v7/finance/quote")
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_probe() -> Dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE % LAZY_MODULES], cwd=BACKEND, env=_env(),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def boot_once(timeout: float) -> Dict[str, float]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=base, timeout=timeout) as client:
+            while True:
+                if time.perf_counter() - started > timeout:
+                    raise TimeoutError(f"/health not ready after {timeout}s")
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            health = time.perf_counter() - started
+            resp = client.post("/recommendations", json={"budget": 1000, "risk": "medium", "horizon": "6m"})
+            resp.raise_for_status()
+            reco = time.perf_counter() - started
+            # Waits for the background warm-up: the first /analyze is ready from here on.
+            client.get("/cache/stats").raise_for_status()
+            ready = time.perf_counter() - started
+        return {"health": health, "recommendations": reco, "pipeline_ready": ready}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="budget for the median /recommendations time")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    probe = import_probe()
+    runs: List[Dict[str, float]] = [boot_once(args.timeout) for _ in range(args.runs)]
+    report: Dict[str, Any] = {"import_main_s": round(probe["seconds"], 3), "eager_heavy_modules": probe["loaded"]}
+    print(f"import main                 {probe['seconds'] * 1000:8.0f} ms")
+    for key in ("health", "recommendations", "pipeline_ready"):
+        values = [r[key] for r in runs]
+        report[key] = {"median_s": round(statistics.median(values), 3), "max_s": round(max(values), 3)}
+        print(f"first {key:<22}{statistics.median(values) * 1000:8.0f} ms median  {max(values) * 1000:8.0f} ms max")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if probe["loaded"]:
+        print(f"FAIL: import main loaded {', '.join(probe['loaded'])}")
+        failed = True
+    if report["recommendations"]["median_s"] > args.max_seconds:
+        print(f"FAIL: /recommendations cold start above {args.max_seconds}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,55 @@
+import asyncio
 import json
 import os
 import re
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_groq import ChatGroq
 
 load_dotenv()
 
-from agent.models import ProfileRequest, AnalyzeRequest
-from agent.graph import graph
-
-model_name = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
-reco_model = ChatGroq(model=model_name, temperature=0)
+# LangGraph, LangChain and yfinance load through the client registry (in the
+# lifespan warm-up or on first use), so importing this module stays fast.
+from agent.models import ProfileRequest, AnalyzeRequest, BatchRequest
+from agent import http_pool, shared_cache
+from agent.clients import clients
+from agent.metrics import REQUEST_SECONDS, render_prometheus, start_trace
+from agent.resilience import start_budget
+from agent.rate_limit import rate_limiter
+from agent.evidence import evidence_bullets
+from agent.news_store import news_store
+from agent.jobs import BATCH_DB, BATCH_LATENCY_BUDGET, BATCH_MAX_ITEMS, BatchRunner, JobStore
+from agent.prefetch import PREFETCH_ENABLED, prefetcher, record_interest
+from agent.quotes import get_quotes, MAX_BATCH
+from agent.response_cache import response_cache, refresh_price
+from agent.universe import get_universe
 
 URL_RE = re.compile(r"https?://\\S+")
 
-app = FastAPI(title="FinSight Demo", version="0.1")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keeps quotes, earnings, company info and news warm for the
+    # recommendation universe and recently popular tickers.
+    news_store.purge()
+    # Heavy clients load in the background; /health and /recommendations never wait on them.
+    warmup = asyncio.ensure_future(clients.warm())
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+    # Resumes batch items left unfinished by a previous run.
+    batch_runner.start()
+    yield
+    warmup.cancel()
+    await batch_runner.stop()
+    await prefetcher.stop()
+    await http_pool.aclose()
+
+app = FastAPI(title="FinSight Demo", version="0.1", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,150 +59,381 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep series bounded.
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    REQUEST_SECONDS.observe(time.perf_counter() - started, path=path, status=response.status_code)
+    return response
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    nodes = await clients.aget("nodes")
+    return {
+        **nodes.cache_stats(), "responses": response_cache.stats(), "prefetch": prefetcher.stats(),
+        "batch": batch_runner.stats(), "clients": clients.stats(),
+        "http": http_pool.stats(), "rate_limits": rate_limiter.stats(), "shared_cache": shared_cache.stats(),
+        "pid": os.getpid()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/quotes")
+async def quotes(symbols: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT,SHOP.TO")):
+    tickers = [s for s in symbols.split(",") if s.strip()]
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(tickers) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH} symbols per request")
+    return {"quotes": await get_quotes(tickers)}
+
+@app.get("/news/{ticker}")
+async def news(
+    ticker: str,
+    q: str = Query("", description="Keywords to match in stored headlines and snippets"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    try:
+        nodes = await clients.aget("nodes")
+        items = await nodes.anews_for(ticker, q, limit)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"News search failed: {e}")
+    return {"ticker": ticker.strip().upper(), "query": q, "items": items}
+
 @app.post("/profile")
 def save_profile(profile: ProfileRequest):
     return {**profile.dict(), "saved": True}
 
 @app.post("/recommendations")
-def recommendations(profile: ProfileRequest):
+async def recommendations(profile: ProfileRequest):
     risk = profile.risk
     horizon = profile.horizon
-    stock_universe = [
-        {"ticker": "AAPL", "name": "Apple Inc.", "market": "USA", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "MSFT", "name": "Microsoft Corp.", "market": "USA", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "NVDA", "name": "NVIDIA Corp.", "market": "USA", "risk": "high", "horizon": ["1m", "6m", "1y"]},
-        {"ticker": "AMZN", "name": "Amazon.com Inc.", "market": "USA", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "META", "name": "Meta Platforms Inc.", "market": "USA", "risk": "high", "horizon": ["1m", "6m", "1y"]},
-        {"ticker": "GOOGL", "name": "Alphabet Inc.", "market": "USA", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "AVGO", "name": "Broadcom Inc.", "market": "USA", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "LLY", "name": "Eli Lilly and Co.", "market": "USA", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "JPM", "name": "JPMorgan Chase", "market": "USA", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "COST", "name": "Costco Wholesale", "market": "USA", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "SHOP", "name": "Shopify Inc.", "market": "Canada", "risk": "high", "horizon": ["1m", "6m", "1y"]},
-        {"ticker": "CSU.TO", "name": "Constellation Software", "market": "Canada", "risk": "low", "horizon": ["1y"]},
-        {"ticker": "LSPD.TO", "name": "Lightspeed Commerce", "market": "Canada", "risk": "high", "horizon": ["1m", "6m"]},
-        {"ticker": "NTR.TO", "name": "Nutrien Ltd.", "market": "Canada", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "CP.TO", "name": "Canadian Pacific Kansas City", "market": "Canada", "risk": "medium", "horizon": ["6m", "1y"]},
-        {"ticker": "BAM", "name": "Brookfield Asset Management", "market": "Canada", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "ENB.TO", "name": "Enbridge Inc.", "market": "Canada", "risk": "low", "horizon": ["6m", "1y"]},
-        {"ticker": "SHOP.TO", "name": "Shopify (TSX)", "market": "Canada", "risk": "high", "horizon": ["6m", "1y"]}
-    ]
-    def score(item):
-        s = 0
-        if item["risk"] == risk:
-            s += 3
-        if horizon in item["horizon"]:
-            s += 2
-        if risk == "high" and item["risk"] == "medium":
-            s += 1
-        return s
-    ranked = sorted(stock_universe, key=score, reverse=True)
-    usa = [s for s in ranked if s["market"] == "USA"][:6]
-    canada = [s for s in ranked if s["market"] == "Canada"][:6]
-    items = usa + canada
-    for item in items:
-        item["rationale"] = f"Aligned with {risk} risk and {horizon} horizon."
-        item.pop("risk", None)
-        item.pop("horizon", None)
+    picks = get_universe().picks(risk, horizon)
+    try:
+        prices = await get_quotes([p["ticker"] for p in picks])
+    except Exception:
+        prices = {}
+    items = []
+    for pick in picks:
+        quote = prices.get(pick["ticker"].upper(), {})
+        items.append({
+            "ticker": pick["ticker"],
+            "name": pick["name"],
+            "market": pick["market"],
+            "rationale": f"Aligned with {risk} risk and {horizon} horizon.",
+            "current_price": quote.get("current_price"),
+            "change_1d_pct": quote.get("change_1d_pct"),
+            "currency": quote.get("currency")
+        })
     return {"items": items}
 
-@app.post("/analyze")
-async def analyze(request: AnalyzeRequest):
-    print(f"Analyzing: {request.question}")
-    
+def _initial_state(request: AnalyzeRequest) -> dict:
+    from langchain_core.messages import HumanMessage
     profile = request.profile.dict()
     if "risk" in profile and "risk_level" not in profile:
         profile["risk_level"] = profile.pop("risk")
 
-    state = {
+    return {
         "messages": [HumanMessage(content=request.question)],
         "user_profile": profile,
         "retry_count": 0
     }
+
+def _round_num(value):
+    if isinstance(value, (int, float)):
+        return round(float(value), 2)
+    return value
+
+def _ensure_list(value, fallback):
+    if isinstance(value, list) and value:
+        return value
+    if isinstance(value, str) and value.strip():
+        return [value]
+    return fallback
+
+def _evidence_pack(evidence):
+    return [
+        {
+            "date": e.get("date") or "Recent",
+            "source": e.get("source", "Web"),
+            "title": e.get("title", ""),
+            "claim": e.get("snippet", ""),
+            "url": e.get("url", "")
+        }
+        for e in evidence
+    ]
+
+def _score_block(shortlist):
+    return {
+        "total": _round_num(shortlist.get("score", 0)),
+        "notes": "Score uses price data, news coverage, 1D move, and risk profile",
+        "breakdown": [
+            {"label": b.get("label"), "value": _round_num(b.get("value"))}
+            for b in shortlist.get("score_breakdown", [])
+        ]
+    }
+
+def _ranked_shortlist(result: dict) -> list:
+    prices = result.get("price_data_by_ticker") or {}
+    return [
+        {
+            "ticker": item.get("ticker"),
+            "company_name": item.get("company_name") or prices.get(item.get("ticker"), {}).get("company_name", ""),
+            "score": _round_num(item.get("score")),
+            "current_price": prices.get(item.get("ticker"), {}).get("current_price"),
+            "change_1d_pct": _round_num(prices.get(item.get("ticker"), {}).get("change_1d_pct")),
+        }
+        for item in result.get("shortlist", [])
+    ]
+
+def _build_response(result: dict) -> dict:
+    # Transform result to match frontend expectation
+    shortlist = result.get("shortlist", [{}])[0]
+    # In comparison mode the top-ranked ticker leads the response.
+    price = (result.get("price_data_by_ticker") or {}).get(shortlist.get("ticker")) or result.get("price_data", {})
+    evidence = result.get("web_evidence", [])
+    draft = result.get("draft", {})
+    validation = result.get("validation", {})
+
+    # Fallbacks for drafts that never passed validation: the top-ranked items only.
+    bullets = evidence_bullets(evidence)
+
+    clean_summary = URL_RE.sub("", draft.get("executive_summary", "")).strip()
+    clean_summary = re.sub(r"\(source:?\s*\)", "", clean_summary, flags=re.IGNORECASE).strip()
+    if "Recommendation:" not in clean_summary:
+        clean_summary = "Recommendation: NO; Expected growth strength: Medium; Risk points: news volatility, data gaps."
+    return {
+        "ticker": shortlist.get("ticker", "UNKNOWN"),
+        "company_name": price.get("company_name", "Unknown"),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "price_data": price,
+        "analysis": {
+            "executive_summary": clean_summary,
+            "expected_return": draft.get("expected_return", "Expected return not available."),
+            "news_summary": _ensure_list(draft.get("news_summary", []), [f"Summary: {b}" for b in bullets]),
+            "bull_case": _ensure_list(draft.get("bull_case", []), [f"News impact: {b}" for b in bullets]),
+            "bear_case": _ensure_list(draft.get("bear_case", []), [f"News impact: {b}" for b in bullets]),
+            "key_risks": _ensure_list(draft.get("key_risks", []), [f"News risk: {b}" for b in bullets]),
+            "last_quarter_result": draft.get("last_quarter_result", "No recent quarterly results data available.")
+        },
+        "evidence_pack": _evidence_pack(evidence),
+        "score": _score_block(shortlist),
+        "shortlist": _ranked_shortlist(result),
+        "validation": validation,
+        "route": {
+            "label": result.get("route"),
+            "source": result.get("route_source"),
+            "confidence": _round_num(result.get("route_confidence"))
+        },
+        "disclaimer": "Not financial advice. Educational demo only."
+    }
+
+async def _prepare(request: AnalyzeRequest, budget: Optional[float] = None):
+    # Resolve the symbol up front: it keys the response cache, and the graph's
+    # resolve node skips its own lookup when the ticker is already in state.
+    start_budget(budget)
+    nodes = await clients.aget("nodes")
+    state = _initial_state(request)
+    state.update(await nodes.aresolve_symbols(request.question))
+    if not state["ticker"]:
+        return state, None, None
+    record_interest(state["tickers"])
+    key = response_cache.key(",".join(state["tickers"]), state["company_name"], request.question, state["user_profile"])
+    cached = await response_cache.aget(key)
+    if cached is not None:
+        try:
+            quotes = await get_quotes([cached["ticker"]] + [item["ticker"] for item in cached.get("shortlist", [])])
+        except Exception:
+            quotes = {}
+        cached = refresh_price(cached, quotes)
+        cached["timestamp"] = datetime.utcnow().isoformat() + "Z"
+        cached["cached"] = True
+    return state, key, cached
+
+async def _store(key, response: dict) -> None:
+    if key is not None and response.get("validation", {}).get("status") == "PASS":
+        await response_cache.aset(key, response)
+
+async def _run_analysis(request: AnalyzeRequest, budget: Optional[float] = None) -> dict:
+    state, key, cached = await _prepare(request, budget)
+    if cached is not None:
+        return cached
+    graph = await clients.aget("graph")
+    response = _build_response(await graph.ainvoke(state))
+    await _store(key, response)
+    return response
+
+@app.post("/analyze")
+async def analyze(request: AnalyzeRequest):
+    print(f"Analyzing: {request.question}")
     
+    trace = start_trace()
     try:
-        result = await graph.ainvoke(state)
-        
-        # Transform result to match frontend expectation
-        # Note: In a real app we'd map this carefully. 
-        # Here we extract key parts.
-        
-        price = result.get("price_data", {})
-        shortlist = result.get("shortlist", [{}])[0]
-        evidence = result.get("web_evidence", [])
-        draft = result.get("draft", {})
-        validation = result.get("validation", {})
-
-        evidence_bullets = []
-        for e in evidence:
-            title = e.get("title", "News item")
-            snippet = e.get("snippet", "")
-            url = e.get("url", "")
-            if url:
-                evidence_bullets.append(f"{title}: {snippet} (source: {url})")
-            else:
-                evidence_bullets.append(f"{title}: {snippet}")
-
-        def ensure_list(value, fallback):
-            if isinstance(value, list) and value:
-                return value
-            if isinstance(value, str) and value.strip():
-                return [value]
-            return fallback
-
-        def round_num(value):
-            if isinstance(value, (int, float)):
-                return round(float(value), 2)
-            return value
-        
-        clean_summary = URL_RE.sub("", draft.get("executive_summary", "")).strip()
-        clean_summary = re.sub(r"\(source:?\s*\)", "", clean_summary, flags=re.IGNORECASE).strip()
-        if "Recommendation:" not in clean_summary:
-            clean_summary = "Recommendation: NO; Expected growth strength: Medium; Risk points: news volatility, data gaps."
+        response = await _run_analysis(request)
+        # Added after storing so cached payloads never carry a stale trace.
+        response["trace"] = trace.to_list()
+        return response
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- Batch ---
+
+async def _batch_item(question: str, profile: dict) -> dict:
+    # Waiting for an upstream slot counts against the budget, hence the longer one.
+    return await _run_analysis(AnalyzeRequest(question=question, profile=profile), BATCH_LATENCY_BUDGET)
+
+batch_runner = BatchRunner(JobStore(BATCH_DB), _batch_item)
+
+@app.post("/analyze/batch", status_code=202)
+async def analyze_batch(request: BatchRequest):
+    questions = [q.strip() for q in request.questions if q.strip()]
+    questions += [f"Should I buy {t.strip().upper()}?" for t in request.tickers if t.strip()]
+    if not questions:
+        raise HTTPException(status_code=400, detail="No questions or tickers given")
+    if len(questions) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    job_id = await batch_runner.submit(questions, request.profile.dict())
+    return {"job_id": job_id, "status": "running", "total": len(questions)}
+
+@app.get("/analyze/batch/{job_id}")
+async def get_batch(job_id: str, include_results: bool = True):
+    job = await asyncio.to_thread(batch_runner.store.get, job_id, include_results=include_results)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+async def _batch_events(job_id: str):
+    # Finished items go out once each, then a final "done" event with the counts.
+    sent, since = set(), 0
+    while True:
+        # The job store is SQLite shared with other workers; its reads stay off the loop.
+        job = await asyncio.to_thread(batch_runner.store.get, job_id, after_seq=since)
+        for item in job["items"]:
+            if item.get("finished_at") is not None and item["index"] not in sent:
+                sent.add(item["index"])
+                since = max(since, item.get("seq") or 0)
+                yield _sse("item", item)
+        if job["status"] == "done":
+            yield _sse("done", {key: job[key] for key in ("job_id", "total", "counts", "finished_at")})
+            return
+        if not await batch_runner.wait_for_change(job_id, timeout=15):
+            yield ": keep-alive\n\n"
+
+@app.get("/analyze/batch/{job_id}/stream")
+async def stream_batch(job_id: str):
+    if await asyncio.to_thread(batch_runner.store.get, job_id, include_results=False) is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return StreamingResponse(
+        _batch_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --- Streaming ---
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _node_payload(node: str, merged: dict) -> dict:
+    # Partial results the UI can render as soon as the node finishes.
+    if node == "supervisor":
+        return {"route": {"label": merged.get("route"), "source": merged.get("route_source")}}
+    if node == "resolve":
+        return {"ticker": merged.get("ticker") or "UNKNOWN", "company_name": merged.get("company_name") or ""}
+    if node == "yfinance":
+        price = merged.get("price_data", {})
+        return {"price_data": price, "company_name": price.get("company_name", "Unknown")}
+    if node == "web":
+        return {"evidence_pack": _evidence_pack(merged.get("web_evidence", []))}
+    if node == "score":
+        shortlist = merged.get("shortlist", [{}])[0]
         return {
             "ticker": shortlist.get("ticker", "UNKNOWN"),
-            "company_name": price.get("company_name", "Unknown"),
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "price_data": price,
-            "analysis": {
-                "executive_summary": clean_summary,
-                "expected_return": draft.get("expected_return", "Expected return not available."),
-                "news_summary": ensure_list(draft.get("news_summary", []), [f"Summary: {b}" for b in evidence_bullets]),
-                "bull_case": ensure_list(draft.get("bull_case", []), [f"News impact: {b}" for b in evidence_bullets]),
-                "bear_case": ensure_list(draft.get("bear_case", []), [f"News impact: {b}" for b in evidence_bullets]),
-                "key_risks": ensure_list(draft.get("key_risks", []), [f"News risk: {b}" for b in evidence_bullets]),
-                "last_quarter_result": draft.get("last_quarter_result", "No recent quarterly results data available.")
-            },
-            "evidence_pack": [
-                {
-                    "date": "Recent",
-                    "source": e.get("source", "Web"),
-                    "title": e.get("title", ""),
-                    "claim": e.get("snippet", ""),
-                    "url": e.get("url", "")
-                }
-                for e in evidence
-            ],
-            "score": {
-                "total": round_num(shortlist.get("score", 0)),
-                "notes": "Score uses price data, news coverage, 1D move, and risk profile",
-                "breakdown": [
-                    {"label": b.get("label"), "value": round_num(b.get("value"))}
-                    for b in shortlist.get("score_breakdown", [])
-                ]
-            },
-            "validation": validation,
-            "disclaimer": "Not financial advice. Educational demo only."
+            "score": _score_block(shortlist),
+            "shortlist": _ranked_shortlist(merged)
         }
+    if node == "validate":
+        return {"validation": merged.get("validation", {})}
+    if node == "intake_guard":
+        return {"missing_fields": merged.get("missing_fields", [])}
+    return {}
+
+async def _analysis_events(request: AnalyzeRequest):
+    started = time.perf_counter()
+    trace = start_trace()
+    try:
+        state, key, cached = await _prepare(request)
+        if cached is not None:
+            cached["trace"] = trace.to_list()
+            yield _sse("result", cached)
+            return
+        merged = dict(state)
+        graph, nodes = await clients.aget("graph"), clients.get("nodes")
+        # Draft fields go out one by one as the structured output streams in.
+        fields = nodes.DraftFieldStream()
+        async for mode, chunk in graph.astream(state, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "draft":
+                    for field, value in fields.feed(message):
+                        yield _sse("draft_field", {"field": field, "value": value})
+                continue
+            for node, update in chunk.items():
+                if update:
+                    merged.update(update)
+                if node == "draft":
+                    for field, value in fields.flush(merged.get("draft") or {}):
+                        yield _sse("draft_field", {"field": field, "value": value})
+                elif node == "on_fail":
+                    fields = nodes.DraftFieldStream()
+                payload = _node_payload(node, merged)
+                payload["node"] = node
+                payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+                yield _sse("node", payload)
+        response = _build_response(merged)
+        await _store(key, response)
+        response["trace"] = trace.to_list()
+        yield _sse("result", response)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+        yield _sse("error", {"detail": str(e)})
+
+@app.post("/analyze/stream")
+async def analyze_stream(request: AnalyzeRequest):
+    return StreamingResponse(
+        _analysis_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
+    import logging
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Worker processes to run; the nodes block on I/O, so several workers serve more
+    # concurrent analyses than one. Workers share caches through CACHE_BACKEND, which
+    # defaults to the SQLite file here when there is more than one, and share rate
+    # limits, news and batch jobs through their SQLite files.
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    host = os.environ.get("HOST", "0.0.0.0")
+    port = int(os.environ.get("PORT", "8000"))
+    if workers > 1:
+        # Read by each worker when it imports main, so it must be set before they start.
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+        for var in ("CACHE_DB", "RATE_LIMIT_DB", "NEWS_STORE_DB", "BATCH_DB"):
+            if os.environ.get(var) == ":memory:":
+                logging.getLogger("finsight").warning("%s=:memory: is not shared between the %d workers", var, workers)
+        uvicorn.run("main:app", host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
@@ -31,8 +31,25 @@ function App() {
     setResult(null);
     try {
       if (!profile) throw new Error("Please save profile first.");
-      const res = await api.analyze(question, profile);
-      setResult(res);
+      // Render partial results as each pipeline node finishes.
+      await api.analyzeStream(question, profile, (event, data) => {
+        if (event === "node") {
+          const { node, elapsed_ms, ...partial } = data;
+          setResult((prev) => ({
+            ...prev,
+            ...partial,
+            // A retried draft starts over.
+            analysis: node === "on_fail" ? undefined : prev?.analysis,
+            progress: [...(prev?.progress || []), { node, elapsed_ms }],
+          }));
+        } else if (event === "draft_field") {
+          setResult((prev) => ({ ...prev, analysis: { ...(prev?.analysis || {}), [data.field]: data.value } }));
+        } else if (event === "result") {
+          setResult((prev) => ({ ...data, progress: prev?.progress || [] }));
+        } else if (event === "error") {
+          throw new Error(data.detail || "Analysis failed");
+        }
+      });
     } catch (e) {
       setError(e.message);
     } finally {
@@ -61,7 +78,7 @@ function App() {
           </div>
         )}
 
-        {loading && (
+        {loading && !result && (
           <div className="text-center py-12 animate-pulse">
             <div className="inline-block w-12 h-12 border-4 border-indigo-200 border-t-indigo-600 rounded-full animate-spin mb-4"></div>
             <p className="text-indigo-800 font-medium">Analyzing market data & news...</p>
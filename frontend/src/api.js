@@ -31,5 +31,37 @@ export const api = {
         });
         if (!res.ok) throw new Error("Analysis failed");
         return res.json();
+    },
+
+    // Streams /analyze/stream (Server-Sent Events over POST) and calls
+    // onEvent(name, data) for every node, draft_field and final result event.
+    analyzeStream: async (question, profile, onEvent) => {
+        const res = await fetch(`${API_BASE}/analyze/stream`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+            body: JSON.stringify({ question, profile }),
+        });
+        if (!res.ok || !res.body) throw new Error("Analysis failed");
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let sep;
+            while ((sep = buffer.indexOf("\n\n")) !== -1) {
+                const raw = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                let event = "message";
+                let data = "";
+                for (const line of raw.split("\n")) {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                }
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
     }
 };
@@ -13,7 +13,19 @@ export default function RecommendationsPanel({ items }) {
                             <div className="font-semibold text-gray-900">{item.ticker}</div>
                             <div className="text-xs text-gray-500">{item.market}</div>
                         </div>
-                        <div className="text-sm text-gray-700">{item.name}</div>
+                        <div className="flex justify-between items-center">
+                            <div className="text-sm text-gray-700">{item.name}</div>
+                            {typeof item.current_price === "number" && (
+                                <div className="text-sm text-gray-900">
+                                    ${item.current_price.toFixed(2)}
+                                    {typeof item.change_1d_pct === "number" && (
+                                        <span className={`ml-2 text-xs font-medium ${item.change_1d_pct >= 0 ? "text-green-600" : "text-red-600"}`}>
+                                            {item.change_1d_pct.toFixed(2)}%
+                                        </span>
+                                    )}
+                                </div>
+                            )}
+                        </div>
                         <div className="text-xs text-gray-600 mt-2">{item.rationale}</div>
                     </div>
                 ))}
@@ -3,13 +3,13 @@ import React from "react";
 export default function ResultsPanel({ result }) {
     if (!result) return null;
 
-    const { ticker, price_data, analysis, evidence_pack, score, disclaimer } = result;
+    const { ticker, price_data, analysis, evidence_pack, score, shortlist, disclaimer } = result;
 
     return (
         <div className="bg-white p-6 rounded-lg shadow-lg border-t-4 border-indigo-500 animate-fade-in">
             <div className="flex justify-between items-start mb-6 border-b pb-4">
                 <div>
-                    <h2 className="text-2xl font-bold text-gray-900">{ticker} <span className="text-gray-500 text-lg font-normal">analysis</span></h2>
+                    <h2 className="text-2xl font-bold text-gray-900">{ticker || "…"} <span className="text-gray-500 text-lg font-normal">analysis</span></h2>
                     <p className="text-sm text-gray-500">{new Date().toLocaleString()}</p>
                 </div>
                 <div className="text-right">
@@ -22,8 +22,45 @@ export default function ResultsPanel({ result }) {
                 </div>
             </div>
 
+            {Array.isArray(shortlist) && shortlist.length > 1 && (
+                <div className="mb-6 overflow-x-auto">
+                    <h3 className="font-bold text-gray-700 mb-2">Comparison (ranked by FinSight score)</h3>
+                    <table className="w-full text-sm text-left">
+                        <thead className="text-xs text-gray-500 border-b">
+                            <tr>
+                                <th className="py-1">#</th>
+                                <th>Ticker</th>
+                                <th>Company</th>
+                                <th className="text-right">Price</th>
+                                <th className="text-right">1D</th>
+                                <th className="text-right">Score</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {shortlist.map((item, i) => (
+                                <tr key={item.ticker} className={`border-b last:border-0 ${i === 0 ? "font-semibold" : ""}`}>
+                                    <td className="py-1">{i + 1}</td>
+                                    <td>{item.ticker}</td>
+                                    <td className="text-gray-600">{item.company_name}</td>
+                                    <td className="text-right">{typeof item.current_price === "number" ? `$${item.current_price.toFixed(2)}` : "N/A"}</td>
+                                    <td className={`text-right ${item.change_1d_pct >= 0 ? "text-green-600" : "text-red-600"}`}>
+                                        {typeof item.change_1d_pct === "number" ? `${item.change_1d_pct.toFixed(2)}%` : "N/A"}
+                                    </td>
+                                    <td className="text-right">{typeof item.score === "number" ? item.score.toFixed(2) : item.score}</td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+            )}
+
             <div className="grid grid-cols-1 md:grid-cols-3 gap-6 mb-8">
                 <div className="md:col-span-2 space-y-6">
+                    {!analysis && (
+                        <div className="bg-indigo-50 p-4 rounded-lg border border-indigo-200">
+                            <h3 className="font-bold text-indigo-800 animate-pulse">Drafting analysis…</h3>
+                        </div>
+                    )}
                     {analysis?.executive_summary && (
                         <div className="bg-indigo-50 p-4 rounded-lg border border-indigo-200">
                             <h3 className="font-bold text-indigo-800 mb-2">Executive Summary</h3>
@@ -56,9 +93,13 @@ export default function ResultsPanel({ result }) {
                 <div className="space-y-6">
                     <div className="bg-gray-50 p-4 rounded-lg">
                         <h3 className="font-bold text-gray-700 mb-2">FinSight Score</h3>
-                        <div className="text-4xl font-black text-indigo-600">
-                            {typeof score?.total === "number" ? score.total.toFixed(2) : score?.total}/100
-                        </div>
+                        {score ? (
+                            <div className="text-4xl font-black text-indigo-600">
+                                {typeof score.total === "number" ? score.total.toFixed(2) : score.total}/100
+                            </div>
+                        ) : (
+                            <div className="text-sm text-gray-500 animate-pulse">Scoring…</div>
+                        )}
                         <p className="text-xs text-gray-500 mt-1">{score?.notes}</p>
                         {Array.isArray(score?.breakdown) && score.breakdown.length > 0 && (
                             <div className="mt-3 text-xs text-gray-600">
@@ -3,7 +3,10 @@ import React, { useState } from 'react';
 export default function TraceDrawer({ result }) {
     const [isOpen, setIsOpen] = useState(false);
 
-    if (!result || !result.validation) return null;
+    if (!result) return null;
+
+    const status = result.validation?.status || "RUNNING";
+    const statusClass = status === "PASS" ? "text-green-400" : status === "RUNNING" ? "text-yellow-300" : "text-red-400";
 
     return (
         <div className="fixed bottom-0 left-0 right-0 bg-gray-900 text-white shadow-xl opacity-95">
@@ -12,15 +15,43 @@ export default function TraceDrawer({ result }) {
                 onClick={() => setIsOpen(!isOpen)}
             >
                 <span className="font-mono text-sm ml-4">
-                    🔍 Debug Trace | Validation: <span className={result.validation.status === "PASS" ? "text-green-400" : "text-red-400"}>{result.validation.status}</span>
+                    🔍 Debug Trace | Validation: <span className={statusClass}>{status}</span>
                 </span>
                 <span className="mr-4">{isOpen ? "▼" : "▲"}</span>
             </div>
 
             {isOpen && (
                 <div className="p-4 overflow-auto max-h-64 font-mono text-xs text-gray-300">
-                    <p>Validation Reasons: {JSON.stringify(result.validation.reasons)}</p>
-                    <p>Suggested Route: {result.validation.suggested_route}</p>
+                    {Array.isArray(result.progress) && result.progress.length > 0 && (
+                        <div className="mb-2">
+                            <p>Pipeline:</p>
+                            {result.progress.map((step, i) => (
+                                <div key={i} className="flex justify-between max-w-xs pl-2">
+                                    <span>{step.node}</span>
+                                    <span>+{step.elapsed_ms} ms</span>
+                                </div>
+                            ))}
+                        </div>
+                    )}
+                    {Array.isArray(result.trace) && result.trace.length > 0 && (
+                        <div className="mb-2">
+                            <p>Timings:</p>
+                            {result.trace.map((span, i) => (
+                                <div
+                                    key={i}
+                                    className={`flex justify-between max-w-md ${span.kind === "node" ? "pl-2" : "pl-6 text-gray-400"} ${span.outcome === "error" ? "text-red-400" : ""}`}
+                                >
+                                    <span>
+                                        {span.name}
+                                        {span.prompt_tokens != null && ` (${span.prompt_tokens}→${span.completion_tokens ?? 0} tok)`}
+                                    </span>
+                                    <span>@{span.start_ms} ms · {span.ms} ms</span>
+                                </div>
+                            ))}
+                        </div>
+                    )}
+                    <p>Validation Reasons: {JSON.stringify(result.validation?.reasons)}</p>
+                    <p>Suggested Route: {result.validation?.suggested_route}</p>
                     {/* Add dummy trace details if available */}
                     <pre className="mt-2 text-gray-500 whitespace-pre-wrap">
                         {JSON.stringify(result, null, 2)}